@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+📍 gunicorn_conf.py
+
+Configuration gunicorn du serveur de légendes (production)
+Remplace le serveur de développement Werkzeug de `python src/caption_server.py`
+
+Installation (dans le venv du serveur) :
+    pip install -r requirements.txt
+
+Lancement (voir start_daemon.sh) :
+    gunicorn -c gunicorn_conf.py 'src.caption_server:create_wsgi_app()'
+
+Toujours un seul worker : ne pas passer -w / --workers (refusé au démarrage)
+HTTPS (USE_HTTPS=true) : CERT_FILE / KEY_FILE doivent exister (pas de génération automatique)
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Mêmes chemins d'import que `python src/caption_server.py` (racine + src/)
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / 'src'))
+
+from dotenv import load_dotenv
+
+# Charger .env avant de lire la configuration (bind, HTTPS, tailles des pools)
+load_dotenv(ROOT_DIR / '.env')
+
+# Pas de débogueur Werkzeug en production (SERVER_DEBUG=true pour le réactiver)
+os.environ.setdefault('SERVER_DEBUG', 'false')
+
+from src.config.server_config import ServerConfig
+
+ServerConfig.load_from_env()
+
+bind = f"{ServerConfig.HOST}:{ServerConfig.PORT}"
+
+# Même certificat que le serveur de développement (ssl_context de main())
+if ServerConfig.USE_HTTPS:
+    certfile = ServerConfig.CERT_FILE
+    keyfile = ServerConfig.KEY_FILE
+
+# Un seul processus : connexions SSE, tâches /ai/jobs et générations en vol
+# sont gardées en mémoire et doivent être vues par toutes les requêtes
+workers = 1
+worker_class = 'gthread'
+
+# Un thread par flux SSE ouvert, plus les générations synchrones et l'administration
+threads = (
+    ServerConfig.MAX_CONCURRENT_REQUESTS
+    + ServerConfig.MAX_ASYNC_WORKERS
+    + ServerConfig.MAX_ASYNC_QUEUE
+    + 4
+)
+
+# Pas de preload : les threads (sondes health check, pools) doivent naître dans le worker
+preload_app = False
+
+# Battement du worker (gthread) : au-delà de la génération la plus longue
+timeout = ServerConfig.REQUEST_TIMEOUT + 30
+
+
+def on_starting(server):
+    """
+    Vérifier la configuration avant de lancer le worker
+    
+    - un seul worker : l'état partagé (SSE, tâches, single-flight) est en mémoire
+    - HTTPS demandé : refuser de démarrer en HTTP si le certificat manque
+    """
+    if server.cfg.workers != 1:
+        raise RuntimeError(
+            f"gunicorn doit tourner avec un seul worker (reçu {server.cfg.workers}) : "
+            "flux SSE, tâches /ai/jobs et générations en vol vivent dans la mémoire du processus"
+        )
+    
+    if ServerConfig.USE_HTTPS:
+        missing = [path for path in (server.cfg.certfile, server.cfg.keyfile)
+                   if not path or not Path(path).exists()]
+        if missing:
+            raise RuntimeError(
+                f"USE_HTTPS=true mais certificat introuvable ({', '.join(map(str, missing))}) : "
+                "générez-le (python src/caption_server.py le crée) ou désactivez USE_HTTPS"
+            )
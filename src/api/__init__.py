@@ -5,8 +5,8 @@
 Module API - Organisation des routes Flask
 """
 
-from .routes import api_bp
+from .routes import api_bp, start_health_monitor
 from .sse_routes import sse_bp
 from .admin_routes import admin_bp
 
-__all__ = ['api_bp', 'sse_bp', 'admin_bp']
\ No newline at end of file
+__all__ = ['api_bp', 'sse_bp', 'admin_bp', 'start_health_monitor']
\ No newline at end of file
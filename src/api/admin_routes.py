@@ -6,31 +6,23 @@ Routes API d'administration
 Configuration, statistiques, maintenance
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 import logging
 import time
 from typing import Dict, Any
 
+# Compteur du module routes du même paquet que ce blueprint
+from .routes import get_active_requests
+
 # Import des utilitaires
 from src.utils.cache_manager import get_generation_cache
+from src.utils.time_utils import now_timestamp
 from src.utils.sse_manager import get_sse_manager
 from src.utils.image_utils import get_image_processor
 from src.config.server_config import ServerConfig
 
 logger = logging.getLogger(__name__)
 
-
-logger = logging.getLogger(__name__)
-
-# Ajoute ça :
-print("🔴 ADMIN_ROUTES IMPORTÉ")
-
-# Créer le blueprint
-admin_bp = Blueprint('admin', __name__)
-
-# Et juste après :
-print(f"🔴 ADMIN_BP CRÉÉ: {admin_bp}")
-
 # Créer le blueprint
 admin_bp = Blueprint('admin', __name__)
 
@@ -40,8 +32,7 @@ def get_ai_config():
     """Récupérer la configuration disponible (langues, styles, modèles)"""
     try:
         # Récupérer le service IA
-        from flask import current_app
-        ai_service = current_app.config.get('SERVICES', {}).get('ai_service')
+        ai_service = current_app.config.get('AI_SERVICE')
         
         if not ai_service:
             return jsonify({
@@ -69,18 +60,14 @@ def get_ai_config():
 @admin_bp.route('/ai/stats', methods=['GET'])
 def get_stats():
     """Récupérer les statistiques d'utilisation"""
-    """Récupérer les statistiques d'utilisation"""
-    #return jsonify({'test': 'stats endpoint works'})
-    logger.info("📊 Début get_stats()")  # Ajoute ça
-        
     try:
         # Récupérer les services
-        from flask import current_app
         services = current_app.config.get('SERVICES', {})
         
         stats = {
             'server': {
                 'uptime': time.time() - current_app.config.get('START_TIME', time.time()),
+                'active_requests': get_active_requests(),
                 'config': ServerConfig.summary()
             },
             'cache': get_generation_cache().get_stats(),
@@ -100,7 +87,7 @@ def get_stats():
         return jsonify({
             'success': True,
             'stats': stats,
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now_timestamp()
         })
         
     except Exception as e:
@@ -116,7 +103,6 @@ def clear_cache():
     """Vider tous les caches"""
     try:
         # Récupérer les services
-        from flask import current_app
         services = current_app.config.get('SERVICES', {})
         
         cleared = {
@@ -150,7 +136,7 @@ def clear_cache():
             'success': True,
             'message': 'Caches vidés',
             'cleared': cleared,
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now_timestamp()
         })
         
     except Exception as e:
@@ -166,8 +152,7 @@ def reload_config():
     """Recharger la configuration des services"""
     try:
         # Récupérer le service IA
-        from flask import current_app
-        ai_service = current_app.config.get('SERVICES', {}).get('ai_service')
+        ai_service = current_app.config.get('AI_SERVICE')
         
         if ai_service:
             ai_service.reload_config()
@@ -179,7 +164,7 @@ def reload_config():
         return jsonify({
             'success': True,
             'message': 'Configuration rechargée',
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now_timestamp()
         })
         
     except Exception as e:
@@ -201,7 +186,7 @@ def get_cache_info():
         return jsonify({
             'success': True,
             'cache_info': cache_info,
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now_timestamp()
         })
         
     except Exception as e:
@@ -223,7 +208,7 @@ def get_sse_connections():
             'success': True,
             'connections': stats['connections_details'],
             'total_active': stats['active_connections'],
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now_timestamp()
         })
         
     except Exception as e:
@@ -249,7 +234,7 @@ def cleanup_sse():
             'success': True,
             'message': 'Connexions SSE inactives nettoyées',
             'active_connections': sse_manager.get_stats()['active_connections'],
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now_timestamp()
         })
         
     except Exception as e:
@@ -265,8 +250,7 @@ def test_pipeline():
     """Tester le pipeline complet avec une image de test"""
     try:
         # Récupérer le service IA
-        from flask import current_app
-        ai_service = current_app.config.get('SERVICES', {}).get('ai_service')
+        ai_service = current_app.config.get('AI_SERVICE')
         
         if not ai_service:
             return jsonify({
@@ -284,7 +268,7 @@ def test_pipeline():
         return jsonify({
             'success': test_result['test_successful'],
             'test_result': test_result,
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now_timestamp()
         })
         
     except Exception as e:
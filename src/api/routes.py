@@ -3,21 +3,29 @@
 📍 src/api/routes.py
 
 Routes API principales pour la génération de légendes
-Endpoint synchrone classique
+Endpoint synchrone classique (ou tâche de fond interrogée par /ai/jobs)
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 import logging
+import threading
 import time
-from typing import Dict, Any
-from pathlib import Path  # AJOUT DE L'IMPORT MANQUANT
+import uuid
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from functools import partial
+from typing import Callable, Dict, Any, Optional, Tuple
+
+from werkzeug.exceptions import RequestEntityTooLarge
 
 # Import des services et utilitaires
 from src.services.ai_service import AIService
 from src.services.geo_service import GeoService
 from src.services.immich_api_service import ImmichAPIService
+from src.api.schemas import CaptionRequest, RequestValidationError
 from src.utils.image_utils import get_image_processor
-from src.utils.cache_manager import get_generation_cache
+from src.utils.cache_manager import CacheManager, get_generation_cache
+from src.utils.time_utils import now_timestamp
+from src.utils.worker_pool import get_ai_executor, submit_generation
 from src.config.server_config import ServerConfig
 
 logger = logging.getLogger(__name__)
@@ -25,8 +33,31 @@ logger = logging.getLogger(__name__)
 # Créer le blueprint
 api_bp = Blueprint('api', __name__)
 
-# Variables globales pour tracking
-active_requests = 0
+# Places de génération synchrone (refus 429 quand aucune n'est libre)
+_request_slots = threading.BoundedSemaphore(ServerConfig.MAX_CONCURRENT_REQUESTS)
+
+# Générations synchrones en cours (jauge lue par /health et /ai/stats)
+_active_requests = 0
+_active_requests_lock = threading.Lock()
+
+# Tâches de génération en mode "job" : {job_id: Future}, expirées après JOB_RESULT_TTL
+_generation_jobs = CacheManager(default_ttl=ServerConfig.JOB_RESULT_TTL, max_size=ServerConfig.MAX_JOBS)
+
+# Champs gardés dans la réponse réduite (?verbose=0) : sans résultats intermédiaires ni métadonnées
+_LITE_RESPONSE_FIELDS = (
+    'success', 'cached', 'asset_id', 'caption', 'language', 'style',
+    'confidence_score', 'generation_time'
+)
+
+# Générations en vol par clé de cache : les requêtes identiques partagent le même Future
+_inflight_generations: Dict[Tuple, Future] = {}
+_inflight_lock = threading.Lock()
+
+# Dernier résultat des sondes base de données / Ollama (rafraîchi en arrière-plan) :
+# (instant de la sonde en time.monotonic(), état)
+_health_probe = {'snapshot': None}
+_health_probe_lock = threading.Lock()
+_health_thread = None
 
 
 @api_bp.route('/health', methods=['GET'])
@@ -34,7 +65,6 @@ def health_check():
     """Vérification santé du serveur"""
     try:
         # Récupérer les services depuis le contexte Flask
-        from flask import current_app
         services = current_app.config.get('SERVICES', {})
         
         # Vérifier les services
@@ -44,32 +74,16 @@ def health_check():
             'immich_service': services.get('immich_service') is not None
         }
         
-        # Tester la base de données
-        db_status = False
-        if services.get('geo_service'):
-            try:
-                services['geo_service'].connect_db()
-                services['geo_service'].disconnect_db()
-                db_status = True
-            except Exception:
-                pass
-        
-        # Tester Ollama
-        ollama_status = False
-        if services.get('ai_service'):
-            try:
-                models_status = services['ai_service'].get_available_models()
-                ollama_status = len(models_status.get('missing', [])) == 0
-            except Exception:
-                pass
+        # État de la base de données et d'Ollama (rafraîchi en arrière-plan)
+        backends_status = get_backends_status(services)
         
         status = {
             'status': 'healthy' if all(services_status.values()) else 'partial',
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': now_timestamp(),
             'services': services_status,
-            'database': db_status,
-            'ollama': ollama_status,
-            'active_requests': active_requests,
+            'database': backends_status['database'],
+            'ollama': backends_status['ollama'],
+            'active_requests': get_active_requests(),
             'cache_size': get_generation_cache().get_stats()['size']
         }
         
@@ -80,10 +94,75 @@ def health_check():
         return jsonify({
             'status': 'error',
             'error': str(e),
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now_timestamp()
         }), 500
 
 
+def probe_backends(services: Dict[str, Any]) -> Dict[str, bool]:
+    """Tester la base de données et Ollama (sondes réelles, sans cache)"""
+    # Tester la base de données
+    db_status = False
+    if services.get('geo_service'):
+        try:
+            services['geo_service'].connect_db()
+            services['geo_service'].disconnect_db()
+            db_status = True
+        except Exception:
+            pass
+    
+    # Tester Ollama (injoignable : 'error' sans liste 'missing')
+    ollama_status = False
+    if services.get('ai_service'):
+        try:
+            models_status = services['ai_service'].get_available_models(use_cache=False)
+            ollama_status = 'error' not in models_status and not models_status.get('missing')
+        except Exception:
+            pass
+    
+    return {'database': db_status, 'ollama': ollama_status}
+
+
+def get_backends_status(services: Dict[str, Any]) -> Dict[str, bool]:
+    """
+    Dernier état connu de la base de données et d'Ollama
+    
+    Lu sans sonder : le thread de start_health_monitor le rafraîchit toutes les
+    ServerConfig.HEALTH_CHECK_TTL secondes. Sonde sur place si l'état est absent ou plus
+    vieux que HEALTH_CHECK_TTL (thread non démarré ou arrêté), une requête à la fois.
+    """
+    snapshot = _health_probe['snapshot']
+    if _is_stale(snapshot):
+        with _health_probe_lock:
+            snapshot = _health_probe['snapshot']
+            if _is_stale(snapshot):
+                snapshot = _health_probe['snapshot'] = (time.monotonic(), probe_backends(services))
+    return snapshot[1]
+
+
+def _is_stale(snapshot: Optional[Tuple[float, Dict[str, bool]]]) -> bool:
+    """Vrai si l'état des sondes manque ou date de plus de HEALTH_CHECK_TTL"""
+    return snapshot is None or time.monotonic() - snapshot[0] > ServerConfig.HEALTH_CHECK_TTL
+
+
+def start_health_monitor(services: Dict[str, Any]):
+    """Lancer (une seule fois) le rafraîchissement périodique des sondes du health check"""
+    global _health_thread
+    if _health_thread is not None:
+        return
+    
+    def refresh_loop():
+        while True:
+            try:
+                _health_probe['snapshot'] = (time.monotonic(), probe_backends(services))
+            except Exception as e:
+                logger.warning(f"⚠️  Erreur sondes health check: {e}")
+            time.sleep(ServerConfig.HEALTH_CHECK_TTL)
+    
+    _health_thread = threading.Thread(target=refresh_loop, name='health-probe', daemon=True)
+    _health_thread.start()
+    logger.info(f"🩺 Sondes health check rafraîchies toutes les {ServerConfig.HEALTH_CHECK_TTL}s")
+
+
 @api_bp.route('/ai/generate-caption', methods=['POST'])
 def generate_caption():
     """
@@ -97,47 +176,117 @@ def generate_caption():
         "longitude": 2.3522,
         "existing_caption": "Ancienne légende...",
         "language": "français",
-        "style": "creative"
+        "style": "creative",
+        "job": false
     }
+    
+    Avec "job": true, répond 202 avec un job_id dès l'image validée ;
+    le résultat est ensuite disponible sur GET /api/ai/jobs/<job_id>
+    
+    Query string: verbose=0 pour une réponse réduite (légende et score seulement)
     """
-    global active_requests
+    return handle_generation_request(parse_json_request)
+
+
+@api_bp.route('/ai/generate-caption-binary', methods=['POST'])
+def generate_caption_binary():
+    """
+    Variante de generate-caption avec l'image envoyée en binaire
+    
+    Body: contenu brut de l'image (application/octet-stream, image/jpeg...)
+    Query string: asset_id, latitude, longitude, existing_caption,
+                  language, style, job, verbose
+    
+    Évite l'encodage base64 (+33%), la chaîne JSON et son décodage côté serveur
+    """
+    return handle_generation_request(parse_binary_request)
+
+
+def parse_json_request():
+    """
+    Lire une requête generate-caption en JSON (image en base64)
+    
+    Returns:
+        (paramètres, empreinte de l'image, fonction de validation de l'image)
+    """
+    data = request.get_json(cache=False)
+    if not data:
+        raise RequestValidationError('Corps JSON requis', 'INVALID_JSON')
+    
+    params = CaptionRequest.from_dict(data)
+    
+    # Empreinte sur les octets décodés : même clé de cache que l'upload binaire
+    image_processor = get_image_processor()
+    image_data = image_processor.decode_base64_image(params.image_base64)
+    if image_data is None:
+        raise RequestValidationError('Erreur traitement image', 'IMAGE_PROCESSING_ERROR')
+    
+    return (
+        params,
+        image_processor.image_digest(image_data),
+        partial(image_processor.load_image_bytes, image_data)
+    )
+
+
+def parse_binary_request():
+    """
+    Lire une requête generate-caption-binary (paramètres en query string, image brute)
+    
+    Returns:
+        (paramètres, empreinte de l'image, fonction de validation de l'image)
+    """
+    params = CaptionRequest.from_dict(request.args, require_image=False)
+    
+    image_data = request.get_data(cache=False)
+    if not image_data:
+        raise RequestValidationError('Image requise dans le corps de la requête', 'MISSING_IMAGE')
+    
+    image_processor = get_image_processor()
+    return (
+        params,
+        image_processor.image_digest(image_data),
+        partial(image_processor.load_image_bytes, image_data)
+    )
+
+
+def handle_generation_request(parse_request: Callable[[], Tuple[CaptionRequest, str, Callable]]):
+    """
+    Traitement commun des générations synchrones (JSON ou binaire)
+    
+    Args:
+        parse_request: Lecture de la requête, retourne (paramètres, empreinte, chargement de l'image)
+    """
+    # Réserver une place (test et prise en une seule opération atomique)
+    if not _request_slots.acquire(blocking=False):
+        return jsonify({
+            'success': False,
+            'error': 'Trop de requêtes simultanées, réessayez plus tard',
+            'code': 'TOO_MANY_REQUESTS'
+        }), 429
+    
+    _track_active_request(1)
+    # Place rendue à la fin de la génération si elle a été soumise, sinon en sortie de requête
+    slot_held_by_generation = False
     
     try:
-        # Vérifier le nombre de requêtes actives
-        if active_requests >= ServerConfig.MAX_CONCURRENT_REQUESTS:
-            return jsonify({
-                'success': False,
-                'error': 'Trop de requêtes simultanées, réessayez plus tard',
-                'code': 'TOO_MANY_REQUESTS'
-            }), 429
-        
-        active_requests += 1
         request_start_time = time.time()
         
-        # Valider les données d'entrée
-        data = request.get_json()
-        if not data:
+        # Valider et convertir les paramètres en une seule passe
+        try:
+            params, image_hash, load_image = parse_request()
+        except RequestValidationError as e:
             return jsonify({
                 'success': False,
-                'error': 'Corps JSON requis',
-                'code': 'INVALID_JSON'
+                'error': str(e),
+                'code': e.code
             }), 400
         
-        # Extraire les paramètres
-        asset_id = data.get('asset_id')
-        image_base64 = data.get('image_base64')
-        latitude = data.get('latitude')
-        longitude = data.get('longitude')
-        existing_caption = data.get('existing_caption', '')
-        language = data.get('language', 'français')
-        style = data.get('style', 'creative')
-        
-        # Validation des paramètres obligatoires
-        validation_error = validate_generation_params(
-            asset_id, image_base64, latitude, longitude
-        )
-        if validation_error:
-            return validation_error
+        asset_id = params.asset_id
+        latitude = params.latitude
+        longitude = params.longitude
+        existing_caption = params.existing_caption
+        language = params.language
+        style = params.style
         
         # Gérer les coordonnées manquantes
         if latitude is None or longitude is None:
@@ -150,103 +299,85 @@ def generate_caption():
             skip_geolocation = False
             logger.info(f"🎨 Génération légende pour asset {asset_id} ({latitude}, {longitude})")
        
-        # Vérifier le cache
+        # Vérifier le cache (clé : contenu de l'image, pas l'asset_id)
         cache = get_generation_cache()
         cached_result = cache.get_caption(
-            asset_id, latitude, longitude, language, style
+            image_hash, latitude, longitude, language, style
+        )
+        
+        # Récupérer les services (une seule résolution du proxy current_app)
+        services = current_app.config.get('SERVICES', {})
+        
+        # Champs propres à l'asset, ajoutés au résultat partagé pour chaque requête
+        finish = partial(
+            complete_response, immich_service=services.get('immich_service'),
+            asset_id=asset_id, existing_caption=existing_caption,
+            latitude=latitude, longitude=longitude
         )
         
         if cached_result:
             logger.info(f"📍 Cache hit pour {asset_id}")
-            active_requests -= 1
-            return jsonify({
-                'success': True,
-                'cached': True,
-                **cached_result
-            })
+            return jsonify(shape_response(finish({**cached_result, 'cached': True})))
        
-        # Sauvegarder l'image temporairement
-        image_processor = get_image_processor()
-        temp_image_path = image_processor.save_base64_image(image_base64, asset_id)
+        # Décoder et valider l'image en mémoire (pas de fichier temporaire)
+        image_data = load_image()
         
-        if not temp_image_path:
+        if image_data is None:
             return jsonify({
                 'success': False,
                 'error': 'Erreur traitement image',
                 'code': 'IMAGE_PROCESSING_ERROR'
             }), 400
         
+        ai_service = services.get('ai_service')
+        
+        if not ai_service:
+            raise ValueError("Service IA non disponible")
+        
+        generation = partial(
+            run_generation, ai_service, image_data, image_hash,
+            latitude, longitude, skip_geolocation, language, style
+        )
+        # Même clé que le cache : une seule génération pour des requêtes identiques simultanées
+        generation_key = (image_hash, round(latitude, 6), round(longitude, 6), language, style)
+        
+        if params.job:
+            # Mode tâche : pool borné des générations, le thread Flask est libéré tout de suite
+            future = shared_generation(generation_key, lambda: submit_generation(generation))
+        else:
+            # Générer la légende avec l'IA dans le pool dédié (attente bornée dans le temps)
+            future = shared_generation(generation_key, lambda: get_ai_executor().submit(generation))
+        
+        if future is not None:
+            # La place reste prise tant que la génération tourne, même après un 202 ou un 504 :
+            # MAX_CONCURRENT_REQUESTS borne ainsi le travail réellement confié à Ollama
+            future.add_done_callback(_release_request_slot)
+            slot_held_by_generation = True
+        
+        if params.job:
+            return start_generation_job(future, finish)
+        
         try:
-            # Récupérer les services
-            from flask import current_app
-            services = current_app.config.get('SERVICES', {})
-            ai_service = services.get('ai_service')
-            immich_service = services.get('immich_service')
-            
-            if not ai_service:
-                raise ValueError("Service IA non disponible")
-            
-            # Enrichir avec données de visages si disponible
-            face_context = {}
-            if immich_service:
-                try:
-                    faces_info = immich_service.get_asset_faces(asset_id)
-                    if faces_info:
-                        face_context = immich_service.generate_face_context_for_ai(faces_info)
-                        logger.info(f"👥 Contexte visages: {face_context.get('social_context', 'N/A')}")
-                    else:
-                        logger.info(f"ℹ️  Pas de visages trouvés pour {asset_id}")
-                except Exception as e:
-                    # Ne pas faire échouer la génération si Immich n'a pas l'asset
-                    logger.warning(f"⚠️  Erreur récupération visages (non bloquant): {e}")
-            
-            # Générer la légende avec l'IA
-            if skip_geolocation:
-                # Appeler une version sans géoloc ou passer un flag
-                generation_result = ai_service.generate_caption(
-                    image_path=temp_image_path,
-                    latitude=None,  # Passer None
-                    longitude=None,
-                    language=language,
-                    style=style
-                )
-            else:
-                generation_result = ai_service.generate_caption(
-                    image_path=temp_image_path,
-                    latitude=float(latitude),
-                    longitude=float(longitude),
-                    language=language,
-                    style=style
-                )
-            
-            # Préparer la réponse
-            response_data = prepare_response_data(
-                generation_result, asset_id, face_context, 
-                existing_caption, latitude, longitude
-            )
-            
-            # Mettre en cache le résultat
-            cache.set_caption(
-                response_data, asset_id, latitude, longitude, language, style
-            )
-            
-            processing_time = time.time() - request_start_time
-            logger.info(f"✅ Légende générée en {processing_time:.1f}s")
-            
-            return jsonify(response_data)
-            
-        finally:
-            # Nettoyer le fichier temporaire
-            try:
-                import os
-                os.unlink(temp_image_path)
-            except Exception:
-                pass
-            
+            response_data = future.result(timeout=ServerConfig.REQUEST_TIMEOUT)
+        except FuturesTimeoutError:
+            # Pas de cancel() : le Future peut être partagé avec d'autres requêtes
+            logger.error(f"⏱️ Timeout génération légende pour {asset_id}")
+            return jsonify({
+                'success': False,
+                'error': f'Génération trop longue (> {ServerConfig.REQUEST_TIMEOUT}s)',
+                'code': 'GENERATION_TIMEOUT'
+            }), 504
+        
+        processing_time = time.time() - request_start_time
+        logger.info(f"✅ Légende générée en {processing_time:.1f}s")
+        
+        return jsonify(shape_response(finish(response_data)))
+        
+    except RequestEntityTooLarge:
+        # Laisser Flask répondre 413 (gestionnaire de create_app)
+        raise
     except Exception as e:
-        import traceback
-        logger.error(f"❌ Erreur génération légende: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.exception(f"❌ Erreur génération légende: {e}")
         return jsonify({
             'success': False,
             'error': f'Erreur interne: {str(e)}',
@@ -254,48 +385,218 @@ def generate_caption():
         }), 500
         
     finally:
-        active_requests -= 1
+        # Libérer la place une seule fois, quel que soit le chemin de sortie
+        if not slot_held_by_generation:
+            _release_request_slot()
+
+
+def _release_request_slot(_future: Optional[Future] = None):
+    """Rendre la place d'une requête admise (en sortie de requête ou à la fin de sa génération)"""
+    _track_active_request(-1)
+    _request_slots.release()
 
 
-def validate_generation_params(asset_id, image_base64, latitude, longitude):
-    """Valider les paramètres de génération"""
-    if not asset_id:
+def run_generation(ai_service, image_data: bytes, image_hash: str,
+                   latitude: float, longitude: float, skip_geolocation: bool,
+                   language: str, style: str) -> Dict[str, Any]:
+    """
+    Générer la légende, préparer la partie partagée de la réponse et la mettre en cache
+    
+    Exécuté hors du thread de requête : pool IA (synchrone) ou pool des générations (tâche).
+    Le résultat ne dépend que de la clé de cache (image, coordonnées, langue, style) :
+    les champs propres à l'asset sont ajoutés par complete_response
+    """
+    generation_result = ai_service.generate_caption(
+        image_path=None,
+        image_bytes=image_data,
+        latitude=None if skip_geolocation else float(latitude),
+        longitude=None if skip_geolocation else float(longitude),
+        language=language,
+        style=style
+    )
+    
+    # Préparer la réponse
+    response_data = prepare_response_data(generation_result)
+    
+    # Mettre en cache le résultat
+    get_generation_cache().set_caption(
+        response_data, image_hash, latitude, longitude, language, style
+    )
+    
+    return response_data
+
+
+def complete_response(response_data: Dict[str, Any], immich_service, asset_id: str,
+                      existing_caption: str, latitude: float, longitude: float) -> Dict[str, Any]:
+    """
+    Ajouter à un résultat partagé (cache, single-flight) les champs propres à la requête
+    
+    Le résultat partagé peut venir d'une autre photo au contenu identique : les visages,
+    l'identifiant, les coordonnées, l'horodatage et la comparaison sont recalculés
+    pour la requête en cours
+    """
+    response_data = {
+        **response_data,
+        'asset_id': asset_id,
+        'intermediate_results': {
+            **response_data['intermediate_results'],
+            'face_context': get_face_context(immich_service, asset_id)
+        },
+        'metadata': {
+            'coordinates': [latitude, longitude],
+            **response_data['metadata'],
+            'existing_caption': existing_caption,
+            'timestamp': now_timestamp()
+        }
+    }
+    
+    # Analyse de comparaison si ancienne légende
+    if existing_caption:
+        response_data['comparison'] = analyze_caption_improvement(existing_caption, response_data)
+    
+    return response_data
+
+
+def shared_generation(key: Tuple, submit: Callable[[], Optional[Future]]) -> Optional[Future]:
+    """
+    Single-flight : réutiliser la génération en vol pour la même clé, sinon la soumettre
+    
+    Args:
+        key: Clé de la génération (mêmes composantes que la clé de cache)
+        submit: Soumission au pool si aucune génération n'est en vol (None si refusée)
+        
+    Returns:
+        Future partagé, ou None si la soumission a été refusée
+    """
+    with _inflight_lock:
+        future = _inflight_generations.get(key)
+        if future is not None:
+            logger.info("🔗 Génération identique déjà en cours, résultat partagé")
+            return future
+        
+        future = submit()
+        if future is None:
+            return None
+        _inflight_generations[key] = future
+    
+    # Hors du verrou : le rappel s'exécute tout de suite si la tâche est déjà finie
+    future.add_done_callback(lambda done: _forget_generation(key, done))
+    return future
+
+
+def _forget_generation(key: Tuple, future: Future):
+    """Retirer une génération terminée de la table des générations en vol"""
+    with _inflight_lock:
+        if _inflight_generations.get(key) is future:
+            del _inflight_generations[key]
+
+
+def start_generation_job(future: Optional[Future],
+                         finish: Callable[[Dict[str, Any]], Dict[str, Any]]):
+    """
+    Enregistrer la génération soumise au pool borné et répondre 202 avec l'identifiant de la tâche
+    
+    Args:
+        future: Génération partagée, ou None si la file d'attente est pleine (503)
+        finish: Ajout des champs propres à la requête, appliqué à la lecture du résultat
+    """
+    if future is None:
         return jsonify({
             'success': False,
-            'error': 'asset_id requis',
-            'code': 'MISSING_ASSET_ID'
-        }), 400
+            'error': 'Serveur saturé, réessayez plus tard',
+            'code': 'QUEUE_FULL'
+        }), 503
+    
+    job_id = uuid.uuid4().hex
+    _generation_jobs.set(job_id, (future, finish))
+    logger.info(f"📥 Tâche de génération {job_id} en file")
     
-    if not image_base64:
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'pending',
+        'status_url': f'/api/ai/jobs/{job_id}'
+    }), 202
+
+
+@api_bp.route('/ai/jobs/<job_id>', methods=['GET'])
+def get_generation_job(job_id: str):
+    """
+    Résultat d'une génération lancée avec "job": true (202 tant qu'elle est en cours)
+    
+    Query string: verbose=0 pour une réponse réduite
+    """
+    job = _generation_jobs.get(job_id)
+    if job is None:
         return jsonify({
             'success': False,
-            'error': 'image_base64 requise',
-            'code': 'MISSING_IMAGE'
-        }), 400
+            'error': 'Tâche inconnue ou expirée',
+            'code': 'JOB_NOT_FOUND'
+        }), 404
     
-    # Si pas de coordonnées, c'est OK maintenant
-    if latitude is None or longitude is None:
-        return None
+    future, finish = job
     
-    # Si coordonnées fournies, les valider
-    try:
-        lat = float(latitude)
-        lon = float(longitude)
-        if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
-            raise ValueError("Coordonnées invalides")
-    except (ValueError, TypeError):
+    if not future.done():
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'pending'
+        }), 202
+    
+    error = future.exception()
+    if error is not None:
+        logger.error(f"❌ Erreur génération légende (tâche {job_id}): {error}")
         return jsonify({
             'success': False,
-            'error': 'Coordonnées GPS invalides',
-            'code': 'INVALID_COORDINATES'
-        }), 400
+            'error': f'Erreur interne: {str(error)}',
+            'code': 'INTERNAL_ERROR'
+        }), 500
     
-    return None
+    return jsonify(shape_response(finish(future.result())))
+
+
+def _track_active_request(delta: int):
+    """Mettre à jour la jauge des générations synchrones en cours"""
+    global _active_requests
+    with _active_requests_lock:
+        _active_requests += delta
+
+
+def get_active_requests() -> int:
+    """Nombre de générations synchrones en cours (lecture sans effet de bord)"""
+    with _active_requests_lock:
+        return _active_requests
+
+
+def shape_response(response_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Réponse complète par défaut, réduite à _LITE_RESPONSE_FIELDS si ?verbose=0"""
+    if request.args.get('verbose', '1') != '0':
+        return response_data
+    return {field: response_data[field] for field in _LITE_RESPONSE_FIELDS if field in response_data}
+
+
+def get_face_context(immich_service, asset_id: str) -> Dict[str, Any]:
+    """Contexte visages pour l'IA (non bloquant, {} si indisponible)"""
+    if not immich_service:
+        return {}
+    
+    try:
+        faces_info = immich_service.get_asset_faces(asset_id)
+        if not faces_info:
+            logger.info(f"ℹ️  Pas de visages trouvés pour {asset_id}")
+            return {}
+        
+        face_context = immich_service.generate_face_context_for_ai(faces_info)
+        logger.info(f"👥 Contexte visages: {face_context.get('social_context', 'N/A')}")
+        return face_context
+    except Exception as e:
+        # Ne pas faire échouer la génération si Immich n'a pas l'asset
+        logger.warning(f"⚠️  Erreur récupération visages (non bloquant): {e}")
+        return {}
 
 
-def prepare_response_data(generation_result, asset_id, face_context, 
-                         existing_caption, latitude, longitude):
-    """Préparer les données de réponse"""
+def prepare_response_data(generation_result):
+    """Préparer les données de réponse communes à toutes les requêtes de même clé de cache"""
     # Récupérer les résultats intermédiaires de manière sûre
     intermediate_results = generation_result.intermediate_results or {}
     image_analysis_raw = intermediate_results.get('image_analysis_raw', {})
@@ -304,7 +605,6 @@ def prepare_response_data(generation_result, asset_id, face_context,
     response_data = {
         'success': True,
         'cached': False,
-        'asset_id': asset_id,
         'generation_time': generation_result.generation_time_seconds,
         'confidence_score': generation_result.confidence_score,
         
@@ -327,61 +627,36 @@ def prepare_response_data(generation_result, asset_id, face_context,
                 'confidence': generation_result.geo_context.get('confidence_score', 0) if generation_result.geo_context else 0
             },
             'cultural_enrichment': intermediate_results.get('cultural_enrichment_raw', ''),
-            'raw_caption': intermediate_results.get('caption_raw', ''),
-            'face_context': face_context
+            'raw_caption': intermediate_results.get('caption_raw', '')
         },
         
         # Métadonnées
         'metadata': {
-            'coordinates': [latitude, longitude],
             'models_used': generation_result.ai_models_used,
-            'processing_steps': generation_result.processing_steps,
-            'existing_caption': existing_caption,
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'processing_steps': generation_result.processing_steps
         }
     }
     
-    # Analyse de comparaison si ancienne légende
-    if existing_caption:
-        response_data['comparison'] = analyze_caption_improvement(
-            existing_caption, generation_result
-        )
-    
     return response_data
 
 
-def analyze_caption_improvement(original: str, generated_result) -> Dict[str, Any]:
-    """Analyser les améliorations par rapport à l'ancienne légende"""
-    try:
-        improvements = []
-        
-        # Longueur
-        if len(generated_result.caption) > len(original):
-            improvements.append("Plus détaillée")
-        
-        # Récupérer les résultats intermédiaires de manière sûre
-        intermediate_results = generated_result.intermediate_results or {}
-        geo_summary_basic = intermediate_results.get('geo_summary_basic', {})
-        
-        # Contexte géographique
-        if geo_summary_basic.get('location_basic'):
-            improvements.append("Contexte géographique ajouté")
-        
-        # Contexte culturel
-        if intermediate_results.get('cultural_enrichment_raw'):
-            improvements.append("Enrichissement culturel")
-        
-        # Style
-        if generated_result.style == 'creative':
-            improvements.append("Style plus créatif")
-        
-        return {
-            'improvements': improvements,
-            'original_length': len(original),
-            'generated_length': len(generated_result.caption),
-            'confidence_boost': generated_result.confidence_score
-        }
-        
-    except Exception as e:
-        logger.warning(f"Erreur analyse amélioration: {e}")
-        return {'improvements': [], 'error': str(e)}
\ No newline at end of file
+def analyze_caption_improvement(original: str, response_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Analyser les améliorations par rapport à l'ancienne légende (réponse déjà préparée)"""
+    # Longueurs et résultats intermédiaires lus une seule fois
+    generated_length = len(response_data['caption'])
+    original_length = len(original)
+    intermediate_results = response_data['intermediate_results']
+    
+    checks = (
+        (generated_length > original_length, "Plus détaillée"),
+        (intermediate_results['geo_context']['location_basic'], "Contexte géographique ajouté"),
+        (intermediate_results['cultural_enrichment'], "Enrichissement culturel"),
+        (response_data['style'] == 'creative', "Style plus créatif"),
+    )
+    
+    return {
+        'improvements': [label for passed, label in checks if passed],
+        'original_length': original_length,
+        'generated_length': generated_length,
+        'confidence_boost': response_data['confidence_score']
+    }
\ No newline at end of file
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+📍 src/api/schemas.py
+
+Schémas des corps JSON des routes API
+Validation et conversion des paramètres en une seule passe
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+
+class RequestValidationError(ValueError):
+    """Paramètres de requête invalides (message + code d'erreur API)"""
+
+    def __init__(self, message: str, code: str):
+        super().__init__(message)
+        self.code = code
+
+
+# Champs obligatoires de AsyncGenerationRequest (avec / sans image dans le corps)
+_REQUIRED_ASYNC_FIELDS = ('asset_id', 'image_base64')
+_REQUIRED_ASYNC_FIELDS_NO_IMAGE = ('asset_id',)
+
+
+def _parse_coordinates(data: Dict[str, Any]):
+    """Extraire (latitude, longitude) ; (None, None) si absentes"""
+    latitude = data.get('latitude')
+    longitude = data.get('longitude')
+    if latitude is None or longitude is None:
+        return None, None
+
+    try:
+        lat = float(latitude)
+        lon = float(longitude)
+    except (ValueError, TypeError):
+        raise RequestValidationError('Coordonnées GPS invalides', 'INVALID_COORDINATES')
+
+    if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+        raise RequestValidationError('Coordonnées GPS invalides', 'INVALID_COORDINATES')
+
+    return lat, lon
+
+
+def _parse_flag(value: Any) -> bool:
+    """Booléen JSON ou de query string ("1", "true")"""
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+@dataclass
+class CaptionRequest:
+    """Paramètres de POST /ai/generate-caption"""
+    asset_id: str
+    image_base64: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    existing_caption: str = ''
+    language: str = 'français'
+    style: str = 'creative'
+    job: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], require_image: bool = True) -> 'CaptionRequest':
+        """
+        Construire la requête depuis le JSON reçu (coordonnées facultatives)
+
+        Args:
+            data: Paramètres de la requête
+            require_image: False si l'image arrive hors du dictionnaire (upload binaire)
+
+        Raises:
+            RequestValidationError: paramètre manquant ou coordonnées invalides
+        """
+        asset_id = data.get('asset_id')
+        if not asset_id:
+            raise RequestValidationError('asset_id requis', 'MISSING_ASSET_ID')
+
+        image_base64 = data.get('image_base64') or ''
+        if require_image and not image_base64:
+            raise RequestValidationError('image_base64 requise', 'MISSING_IMAGE')
+
+        latitude, longitude = _parse_coordinates(data)
+
+        return cls(
+            asset_id=asset_id,
+            image_base64=image_base64,
+            latitude=latitude,
+            longitude=longitude,
+            existing_caption=data.get('existing_caption', ''),
+            language=data.get('language', 'français'),
+            style=data.get('style', 'creative'),
+            job=_parse_flag(data.get('job'))
+        )
+
+
+@dataclass
+class AsyncGenerationRequest:
+    """Paramètres de POST /ai/generate-caption-async (et de sa variante binaire)"""
+    request_id: str
+    asset_id: str
+    image_base64: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    existing_caption: str = ''
+    language: str = 'français'
+    style: str = 'creative'
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], require_image: bool = True) -> 'AsyncGenerationRequest':
+        """
+        Construire la requête depuis le JSON reçu
+
+        Args:
+            data: Paramètres de la requête
+            require_image: False si l'image arrive hors du dictionnaire (upload binaire)
+
+        Raises:
+            RequestValidationError: paramètre manquant ou coordonnées invalides
+        """
+        request_id = data.get('request_id')
+        if not request_id:
+            raise RequestValidationError('request_id requis pour SSE', 'MISSING_REQUEST_ID')
+
+        required = _REQUIRED_ASYNC_FIELDS if require_image else _REQUIRED_ASYNC_FIELDS_NO_IMAGE
+        for field in required:
+            if data.get(field) is None:
+                raise RequestValidationError(f'Paramètre manquant: {field}', f'MISSING_{field.upper()}')
+
+        latitude, longitude = _parse_coordinates(data)
+
+        return cls(
+            request_id=request_id,
+            asset_id=data['asset_id'],
+            image_base64=data.get('image_base64') or '',
+            latitude=latitude,
+            longitude=longitude,
+            existing_caption=data.get('existing_caption') or '',
+            language=data.get('language', 'français'),
+            style=data.get('style', 'creative')
+        )
+
+
+@dataclass
+class RegenerateRequest:
+    """Corps de POST /ai/regenerate-final"""
+    image_description: str = ''
+    geo_context: str = ''
+    cultural_enrichment: str = ''
+    language: str = 'français'
+    style: str = 'creative'
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RegenerateRequest':
+        """Construire la requête depuis le JSON reçu"""
+        return cls(
+            image_description=data.get('image_description', ''),
+            geo_context=data.get('geo_context', ''),
+            cultural_enrichment=data.get('cultural_enrichment', ''),
+            language=data.get('language', 'français'),
+            style=data.get('style', 'creative')
+        )
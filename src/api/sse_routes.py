@@ -5,75 +5,56 @@
 Routes API pour Server-Sent Events (SSE)
 Génération asynchrone avec progression en temps réel
 """
-# D'abord les imports système
-import sys
-from pathlib import Path
-# Ajouter le chemin parent au PYTHONPATH
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Maintenant les autres imports
 from flask import Blueprint, request, jsonify, Response, current_app
 import logging
-import json
-import time
 import threading
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from dataclasses import replace
 from typing import Dict, Any
 
-# Import des services et utilitaires (sans ..)
-from utils.sse_manager import get_sse_manager
-from utils.image_utils import get_image_processor
-from config.server_config import ServerConfig
+from werkzeug.exceptions import RequestEntityTooLarge
+
+# Import des services et utilitaires (mêmes modules que routes.py / admin_routes.py)
+from src.services.geo_service import GeoLocation
+from src.utils.sse_manager import get_sse_manager
+from src.utils.image_utils import TempImage, get_image_processor
+from src.utils.time_utils import now_timestamp
+from src.utils.worker_pool import get_ai_executor, submit_generation
+from src.api.schemas import AsyncGenerationRequest, RegenerateRequest, RequestValidationError
+from src.config.server_config import ServerConfig
 
 logger = logging.getLogger(__name__)
 
 # Créer le blueprint
 sse_bp = Blueprint('sse', __name__)
 
+# Régénérations envoyées simultanément à Mistral
+_regenerate_slots = threading.BoundedSemaphore(ServerConfig.MAX_CONCURRENT_REGENERATIONS)
+
+# Champs des résultats intermédiaires diffusés par étape
+# (clé envoyée au client, clé dans le résultat source, valeur par défaut)
+_PARTIAL_RESULT_FIELDS = {
+    'image_analysis': (
+        ('description', 'description', ''),
+        ('confidence', 'confidence', 0),
+        ('model', 'model_used', '')
+    ),
+    'geolocation': (
+        ('location_basic', 'location_basic', ''),
+        ('cultural_context', 'cultural_context', '')
+    )
+}
+
 
 @sse_bp.route('/ai/generate-caption-stream/<request_id>')
 def generate_caption_stream(request_id):
     """
     Endpoint SSE pour génération avec progression en temps réel
     """
-    def event_stream():
-        """Générateur de flux SSE"""
-        sse_manager = get_sse_manager()
-        connection = sse_manager.create_connection(request_id)
-        
-        try:
-            # Message de connexion établie
-            yield f"data: {json.dumps({'event': 'connected', 'message': 'Connexion SSE établie'})}\n\n"
-            
-            # Boucle de lecture des messages
-            while connection.is_active:
-                # Récupérer un message
-                message = connection.get_message()
-                
-                if message:
-                    # Formater et envoyer le message SSE
-                    sse_response = sse_manager.format_sse_response(message)
-                    yield sse_response
-                    
-                    # Si c'est un message de fin, arrêter le flux
-                    if message.get('event') in ['complete', 'error']:
-                        break
-                else:
-                    # Heartbeat pour maintenir la connexion
-                    heartbeat = {
-                        'event': 'heartbeat',
-                        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                    yield f"data: {json.dumps(heartbeat)}\n\n"
-                    
-        except GeneratorExit:
-            # Client a fermé la connexion
-            logger.info(f"Client déconnecté: {request_id}")
-        finally:
-            # Nettoyer la connexion
-            sse_manager.close_connection(request_id)
-    
+    sse_manager = get_sse_manager()
     return Response(
-        event_stream(),
+        sse_manager.stream_events(request_id, ServerConfig.SSE_HEARTBEAT_INTERVAL),
         mimetype='text/event-stream',
         headers={
             'Cache-Control': 'no-cache',
@@ -103,7 +84,7 @@ def generate_caption_async():
     }
     """
     try:
-        data = request.get_json()
+        data = request.get_json(cache=False)
         if not data:
             return jsonify({
                 'success': False,
@@ -111,39 +92,78 @@ def generate_caption_async():
                 'code': 'INVALID_JSON'
             }), 400
         
-        request_id = data.get('request_id')
-        if not request_id:
+        # Valider et convertir les paramètres
+        try:
+            params = AsyncGenerationRequest.from_dict(data)
+        except RequestValidationError as e:
+            return validation_error_response(e)
+        
+        # Sauvegarder l'image ici : le worker ne reçoit que le chemin,
+        # la chaîne base64 est libérée dès la fin de la requête
+        temp_image = get_image_processor().save_base64_image(params.image_base64, params.asset_id)
+        if not temp_image:
             return jsonify({
                 'success': False,
-                'error': 'request_id requis pour SSE',
-                'code': 'MISSING_REQUEST_ID'
+                'error': 'Erreur traitement image',
+                'code': 'IMAGE_PROCESSING_ERROR'
             }), 400
+        params = replace(params, image_base64='')
         
-        # Valider les autres paramètres
-        validation_error = validate_async_params(data)
-        if validation_error:
-            return validation_error
+        return start_async_generation(params, temp_image)
         
-        # Récupérer l'app pour le contexte
-        app = current_app._get_current_object()
+    except RequestEntityTooLarge:
+        # Laisser Flask répondre 413 (gestionnaire de create_app)
+        raise
+    except Exception as e:
+        logger.exception(f"❌ Erreur démarrage génération async: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'code': 'ASYNC_START_ERROR'
+        }), 500
+
+
+@sse_bp.route('/ai/generate-caption-async-binary', methods=['POST'])
+def generate_caption_async_binary():
+    """
+    Variante de generate-caption-async avec l'image envoyée en binaire
+    
+    Body: contenu brut de l'image (application/octet-stream, image/jpeg...)
+    Query string: request_id, asset_id, latitude, longitude,
+                  existing_caption, language, style
+    
+    Évite l'encodage base64 (+33%) et son décodage côté serveur
+    """
+    try:
+        # Valider et convertir les paramètres
+        try:
+            params = AsyncGenerationRequest.from_dict(request.args, require_image=False)
+        except RequestValidationError as e:
+            return validation_error_response(e)
         
-        # Démarrer le traitement en arrière-plan
-        thread = threading.Thread(
-            target=process_generation_async,
-            args=(request_id, data, app),
-            daemon=True
-        )
-        thread.start()
+        image_data = request.get_data(cache=False)
+        if not image_data:
+            return jsonify({
+                'success': False,
+                'error': 'Image requise dans le corps de la requête',
+                'code': 'MISSING_IMAGE'
+            }), 400
         
-        return jsonify({
-            'success': True,
-            'request_id': request_id,
-            'message': 'Génération démarrée, connectez-vous au flux SSE',
-            'sse_url': f'/api/ai/generate-caption-stream/{request_id}'
-        })
+        temp_image = get_image_processor().save_image_bytes(image_data, params.asset_id)
+        if not temp_image:
+            return jsonify({
+                'success': False,
+                'error': 'Erreur traitement image',
+                'code': 'IMAGE_PROCESSING_ERROR'
+            }), 400
+        
+        return start_async_generation(params, temp_image)
         
+    except RequestEntityTooLarge:
+        # Laisser Flask répondre 413 (gestionnaire de create_app)
+        raise
     except Exception as e:
-        logger.error(f"❌ Erreur démarrage génération async: {e}")
+        logger.exception(f"❌ Erreur démarrage génération async: {e}")
         return jsonify({
             'success': False,
             'error': str(e),
@@ -151,6 +171,31 @@ def generate_caption_async():
         }), 500
 
 
+def start_async_generation(params: AsyncGenerationRequest, temp_image: TempImage):
+    """Soumettre la génération au pool et répondre avec l'URL du flux SSE"""
+    request_id = params.request_id
+    
+    # Récupérer l'app pour le contexte
+    app = current_app._get_current_object()
+    
+    # Démarrer le traitement en arrière-plan (pool borné)
+    if submit_generation(process_generation_async, request_id, params, temp_image, app) is None:
+        logger.warning(f"⚠️ File de génération pleine, refus de {request_id}")
+        temp_image.release()
+        return jsonify({
+            'success': False,
+            'error': 'Serveur saturé, réessayez plus tard',
+            'code': 'QUEUE_FULL'
+        }), 503
+    
+    return jsonify({
+        'success': True,
+        'request_id': request_id,
+        'message': 'Génération démarrée, connectez-vous au flux SSE',
+        'sse_url': f'/api/ai/generate-caption-stream/{request_id}'
+    })
+
+
 @sse_bp.route('/ai/regenerate-final', methods=['POST'])
 def regenerate_final():
     """
@@ -174,16 +219,17 @@ def regenerate_final():
             }), 400
         
         # Extraire les paramètres
-        image_description = data.get('image_description', '')
-        geo_context = data.get('geo_context', '')
-        cultural_enrichment = data.get('cultural_enrichment', '')
-        language = data.get('language', 'français')
-        style = data.get('style', 'creative')
+        params = RegenerateRequest.from_dict(data)
+        image_description = params.image_description
+        geo_context = params.geo_context
+        cultural_enrichment = params.cultural_enrichment
+        language = params.language
+        style = params.style
         
         logger.info("♻️ Régénération légende finale")
         
         # Récupérer le service IA
-        ai_service = current_app.config.get('SERVICES', {}).get('ai_service')
+        ai_service = current_app.config.get('AI_SERVICE')
         
         if not ai_service:
             return jsonify({
@@ -200,15 +246,42 @@ def regenerate_final():
             'geographic_context': ''
         }
         
-        # Générer uniquement avec Mistral
-        prompts_used = {}
-        raw_caption = ai_service._generate_creative_caption(
-            image_description,
-            enriched_context,
-            language,
-            style,
-            prompts_used
-        )
+        # Limiter les régénérations en vol vers Mistral
+        if not _regenerate_slots.acquire(blocking=False):
+            return jsonify({
+                'success': False,
+                'error': 'Trop de régénérations simultanées, réessayez plus tard',
+                'code': 'TOO_MANY_REQUESTS'
+            }), 429
+        
+        try:
+            # Générer uniquement avec Mistral dans le pool IA
+            prompts_used = {}
+            future = get_ai_executor().submit(
+                ai_service._generate_creative_caption,
+                image_description,
+                enriched_context,
+                language,
+                style,
+                prompts_used
+            )
+        except BaseException:
+            _regenerate_slots.release()
+            raise
+        
+        # La place n'est rendue qu'à la fin réelle de l'appel Mistral,
+        # même si cette requête abandonne l'attente (timeout)
+        future.add_done_callback(lambda _: _regenerate_slots.release())
+        
+        try:
+            raw_caption = future.result(timeout=ServerConfig.REGENERATE_TIMEOUT)
+        except FuturesTimeoutError:
+            logger.error("⏱️ Timeout régénération légende finale")
+            return jsonify({
+                'success': False,
+                'error': f'Régénération trop longue (> {ServerConfig.REGENERATE_TIMEOUT}s)',
+                'code': 'REGENERATION_TIMEOUT'
+            }), 504
         
         # Post-traitement
         final_caption = ai_service.config.clean_caption(raw_caption)
@@ -224,11 +297,11 @@ def regenerate_final():
             'style': style,
             'generation_time': 0.1,
             'method': 'regenerated',
-            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+            'timestamp': now_timestamp()
         })
         
     except Exception as e:
-        logger.error(f"❌ Erreur régénération finale: {e}")
+        logger.exception(f"❌ Erreur régénération finale: {e}")
         return jsonify({
             'success': False,
             'error': str(e),
@@ -236,64 +309,44 @@ def regenerate_final():
         }), 500
 
 
-def validate_async_params(data: Dict[str, Any]):
-    """Valider les paramètres pour génération asynchrone"""
-    required = ['asset_id', 'image_base64'] #, 'latitude', 'longitude']
-    
-    for field in required:
-        if field not in data or data[field] is None:
-            return jsonify({
-                'success': False,
-                'error': f'Paramètre manquant: {field}',
-                'code': f'MISSING_{field.upper()}'
-            }), 400
-    
-    # Valider les coordonnées
-        if 'latitude' in data and 'longitude' in data and data['latitude'] is not None and data['longitude'] is not None:
-            try:
-                lat = float(data['latitude'])
-                lon = float(data['longitude'])
-                if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
-                    raise ValueError("Coordonnées invalides")
-            except (ValueError, TypeError):
-                return jsonify({
-                    'success': False,
-                    'error': 'Coordonnées GPS invalides',
-                    'code': 'INVALID_COORDINATES'
-                }), 400
-            
-        return None
+def validation_error_response(error: RequestValidationError):
+    """Réponse 400 pour des paramètres invalides"""
+    return jsonify({
+        'success': False,
+        'error': str(error),
+        'code': error.code
+    }), 400
 
 
-def process_generation_async(request_id: str, data: Dict[str, Any], app):
-    """Fonction de traitement en arrière-plan pour génération asynchrone"""
-    with app.app_context():
-        # Imports absolus dans le contexte
-        import sys
-        import os
-        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        
-        from utils.sse_manager import get_sse_manager
-        from utils.image_utils import get_image_processor
-        
-        sse_manager = get_sse_manager()
+def build_partial_result(step: str, source: Dict[str, Any], **extra) -> Dict[str, Any]:
+    """Construire le résultat intermédiaire d'une étape depuis _PARTIAL_RESULT_FIELDS"""
+    result = {dst: source.get(src, default) for dst, src, default in _PARTIAL_RESULT_FIELDS[step]}
+    result.update(extra)
+    return result
+
+
+def process_generation_async(request_id: str, params: AsyncGenerationRequest,
+                             temp_image: TempImage, app):
+    """
+    Fonction de traitement en arrière-plan pour génération asynchrone
+    
+    L'image est déjà sauvegardée dans temp_image (libérée en fin de traitement)
+    """
+    sse_manager = get_sse_manager()
+    
+    try:
+        logger.info(f"🎨 Démarrage génération async pour {request_id}")
         
-        try:
-            logger.info(f"🎨 Démarrage génération async pour {request_id}")
-            
-            # Extraire les paramètres
-            asset_id = data['asset_id']
-            image_base64 = data['image_base64']
-            language = data.get('language', 'français')
-            style = data.get('style', 'creative')
-            latitude = data.get('latitude')
-            longitude = data.get('longitude')
-            if latitude is not None:
-                latitude = float(latitude)
-            if longitude is not None:
-                longitude = float(longitude)
+        # Paramètres déjà validés et convertis
+        asset_id = params.asset_id
+        language = params.language
+        style = params.style
+        latitude = params.latitude
+        longitude = params.longitude
 
-            # Récupérer les services
+        try:
+            # Récupérer les services sur l'objet app lui-même : aucun contexte
+            # Flask requis, le pipeline n'utilise ensuite que des variables locales
             services = app.config.get('SERVICES', {})
             ai_service = services.get('ai_service')
             geo_service = services.get('geo_service')
@@ -301,161 +354,143 @@ def process_generation_async(request_id: str, data: Dict[str, Any], app):
             if not ai_service or not geo_service:
                 raise ValueError("Services non disponibles")
             
-            # Étape 1: Préparation
-            sse_manager.broadcast_progress(request_id, 'preparation', 5, 'Préparation de l\'image...')
+            analyze_image = ai_service._analyze_image_with_llava
+            enrich_cultural_context = ai_service._enrich_cultural_context
+            generate_creative_caption = ai_service._generate_creative_caption
+            calculate_confidence_score = ai_service._calculate_confidence_score
+            clean_caption = ai_service.config.clean_caption
+            broadcast_progress = sse_manager.broadcast_progress
+            broadcast_stage = sse_manager.broadcast_stage
             
-            # Sauvegarder l'image
-            image_processor = get_image_processor()
-            temp_image_path = image_processor.save_base64_image(image_base64, asset_id)
+            # Étape 1: Préparation (image déjà sauvegardée par la route)
+            broadcast_progress(request_id, 'preparation', 10, 'Image préparée')
             
-            if not temp_image_path:
-                sse_manager.broadcast_error(request_id, 'Erreur traitement image')
-                return
+            # Étape 2: Analyse d'image
+            broadcast_progress(request_id, 'image_analysis', 15, 'Analyse avec LLaVA...')
             
-            sse_manager.broadcast_progress(request_id, 'preparation', 10, 'Image préparée')
+            prompts_used = {}
+            image_analysis = analyze_image(temp_image.path, prompts_used)
+            broadcast_stage(
+                request_id, 'image_analysis', 30, 'Analyse d\'image terminée',
+                build_partial_result('image_analysis', image_analysis)
+            )
             
-            try:
-                # Étape 2: Analyse d'image
-                sse_manager.broadcast_progress(request_id, 'image_analysis', 15, 'Analyse avec LLaVA...')
-                
-                prompts_used = {}
-                image_analysis = ai_service._analyze_image_with_llava(temp_image_path, prompts_used)
-                sse_manager.broadcast_progress(request_id, 'image_analysis', 30, 'Analyse d\'image terminée')
-                sse_manager.broadcast_result(request_id, 'image_analysis', {
-                    'description': image_analysis['description'],
-                    'confidence': image_analysis['confidence'],
-                    'model': image_analysis['model_used']
-                })
-                
-                # Étape 3: Géolocalisation
-                if latitude is not None and longitude is not None:
-                    sse_manager.broadcast_progress(request_id, 'geolocation', 35, 'Géolocalisation en cours...')
-                    
-                    geo_location = geo_service.get_location_info(latitude, longitude)
-                    geo_summary = geo_service.get_location_summary_for_ai(geo_location)
-                    
-                    sse_manager.broadcast_progress(request_id, 'geolocation', 50, 'Géolocalisation terminée')
-                    sse_manager.broadcast_result(request_id, 'geolocation', {
-                        'location_basic': geo_summary.get('location_basic', ''),
-                        'cultural_context': geo_summary.get('cultural_context', ''),
-                        'confidence': geo_location.confidence_score
-                    })
-                else:
-                    # Pas de géolocalisation disponible
-                    sse_manager.broadcast_progress(request_id, 'geolocation', 50, 'Pas de géolocalisation')
-                    
-                    # Créer des objets vides
-                    from services.geo_service import GeoLocation
-                    geo_location = GeoLocation(
-                        latitude=0, 
-                        longitude=0,
-                        formatted_address="Lieu inconnu",
-                        confidence_score=0.0
-                    )
-                    geo_summary = {
-                        'location_basic': '',
-                        'cultural_context': '',
-                        'nearby_attractions': '',
-                        'geographic_context': ''
-                    }
-                    
-                    sse_manager.broadcast_result(request_id, 'geolocation', {
-                        'location_basic': 'Pas de localisation',
-                        'cultural_context': '',
-                        'confidence': 0.0
-                    })
-                
-                # Étape 4: Enrichissement culturel
-                cultural_enrichment = ""
-                if latitude is not None and longitude is not None and geo_location.confidence_score > 0.5 and geo_summary.get('cultural_context'):
-                    sse_manager.broadcast_progress(request_id, 'cultural_enrichment', 55, 'Enrichissement culturel...')
-                    
-                    try:
-                        cultural_enrichment = ai_service._enrich_cultural_context(geo_summary, prompts_used)
-                        if cultural_enrichment:
-                            sse_manager.broadcast_progress(request_id, 'cultural_enrichment', 65, 'Enrichissement terminé')
-                            sse_manager.broadcast_result(request_id, 'cultural_enrichment', {
-                                'enrichment': cultural_enrichment
-                            })
-                    except Exception as e:
-                        logger.warning(f"Erreur enrichissement culturel: {e}")
-                
-                # Étape 5: Génération légende
-                sse_manager.broadcast_progress(request_id, 'caption_generation', 70, 'Génération créative...')
+            # Étape 3: Géolocalisation
+            if latitude is not None and longitude is not None:
+                broadcast_progress(request_id, 'geolocation', 35, 'Géolocalisation en cours...')
                 
-                enriched_context = geo_summary.copy()
-                if cultural_enrichment:
-                    enriched_context['cultural_enrichment'] = cultural_enrichment
+                geo_location = geo_service.get_location_info(latitude, longitude)
+                geo_summary = geo_service.get_location_summary_for_ai(geo_location)
                 
-                raw_caption = ai_service._generate_creative_caption(
-                    image_analysis['description'],
-                    enriched_context,
-                    language,
-                    style,
-                    prompts_used
+                broadcast_stage(
+                    request_id, 'geolocation', 50, 'Géolocalisation terminée',
+                    build_partial_result('geolocation', geo_summary,
+                                         confidence=geo_location.confidence_score)
                 )
-                
-                sse_manager.broadcast_progress(request_id, 'caption_generation', 85, 'Légende générée')
-                sse_manager.broadcast_result(request_id, 'raw_caption', {
-                    'caption': raw_caption
-                })
-                
-                # Étape 6: Post-traitement
-                sse_manager.broadcast_progress(request_id, 'post_processing', 90, 'Finalisation...')
-                
-                final_caption = ai_service.config.clean_caption(raw_caption)
-                confidence_score = ai_service._calculate_confidence_score(
-                    image_analysis, geo_location, final_caption
+            else:
+                # Pas de géolocalisation disponible : créer des objets vides
+                geo_location = GeoLocation(
+                    latitude=0, 
+                    longitude=0,
+                    formatted_address="Lieu inconnu",
+                    confidence_score=0.0
                 )
+                geo_summary = {
+                    'location_basic': '',
+                    'cultural_context': '',
+                    'nearby_attractions': '',
+                    'geographic_context': ''
+                }
                 
-                # Étape 7: Résultat final
-                sse_manager.broadcast_progress(request_id, 'completion', 100, 'Génération terminée!')
+                broadcast_stage(request_id, 'geolocation', 50, 'Pas de géolocalisation', {
+                    'location_basic': 'Pas de localisation',
+                    'cultural_context': '',
+                    'confidence': 0.0
+                })
+            
+            # Étape 4: Enrichissement culturel
+            cultural_enrichment = ""
+            if latitude is not None and longitude is not None and geo_location.confidence_score > 0.5 and geo_summary.get('cultural_context'):
+                broadcast_progress(request_id, 'cultural_enrichment', 55, 'Enrichissement culturel...')
                 
-                final_result = {
-                    'success': True,
-                    'asset_id': asset_id,
-                    'caption': final_caption,
-                    'confidence_score': confidence_score,
-                    'language': language,
-                    'style': style,
-                    'intermediate_results': {
-                        'image_analysis': {
-                            'description': image_analysis['description'],
-                            'confidence': image_analysis['confidence']
-                        },
-                        'geo_context': {
-                            'location_basic': geo_summary.get('location_basic', ''),
-                            'cultural_context': geo_summary.get('cultural_context', ''),
-                            'confidence': geo_location.confidence_score
-                        },
-                        'cultural_enrichment': cultural_enrichment,
-                        'raw_caption': raw_caption
+                try:
+                    cultural_enrichment = enrich_cultural_context(geo_summary, prompts_used)
+                    if cultural_enrichment:
+                        broadcast_stage(request_id, 'cultural_enrichment', 65, 'Enrichissement terminé', {
+                            'enrichment': cultural_enrichment
+                        })
+                except Exception as e:
+                    logger.warning(f"Erreur enrichissement culturel: {e}")
+            
+            # Étape 5: Génération légende
+            broadcast_progress(request_id, 'caption_generation', 70, 'Génération créative...')
+            
+            enriched_context = geo_summary.copy()
+            if cultural_enrichment:
+                enriched_context['cultural_enrichment'] = cultural_enrichment
+            
+            raw_caption = generate_creative_caption(
+                image_analysis['description'],
+                enriched_context,
+                language,
+                style,
+                prompts_used
+            )
+            
+            broadcast_stage(request_id, 'raw_caption', 85, 'Légende générée', {
+                'caption': raw_caption
+            }, progress_step='caption_generation')
+            
+            # Étape 6: Post-traitement
+            broadcast_progress(request_id, 'post_processing', 90, 'Finalisation...')
+            
+            final_caption = clean_caption(raw_caption)
+            confidence_score = calculate_confidence_score(
+                image_analysis, geo_location, final_caption
+            )
+            
+            # Étape 7: Résultat final
+            broadcast_progress(request_id, 'completion', 100, 'Génération terminée!')
+            
+            final_result = {
+                'success': True,
+                'asset_id': asset_id,
+                'caption': final_caption,
+                'confidence_score': confidence_score,
+                'language': language,
+                'style': style,
+                'intermediate_results': {
+                    'image_analysis': {
+                        'description': image_analysis['description'],
+                        'confidence': image_analysis['confidence']
+                    },
+                    'geo_context': {
+                        'location_basic': geo_summary.get('location_basic', ''),
+                        'cultural_context': geo_summary.get('cultural_context', ''),
+                        'confidence': geo_location.confidence_score
                     },
-                    'metadata': {
-                        'coordinates': [latitude, longitude],
-                        'existing_caption': data.get('existing_caption', ''),
-                        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
-                    }
+                    'cultural_enrichment': cultural_enrichment,
+                    'raw_caption': raw_caption
+                },
+                'metadata': {
+                    'coordinates': [latitude, longitude] if latitude is not None and longitude is not None else None,
+                    'existing_caption': params.existing_caption,
+                    'timestamp': now_timestamp()
                 }
+            }
+            
+            sse_manager.broadcast_complete(request_id, final_result)
+            logger.info(f"✅ Génération async terminée pour {request_id}")
+            
+        finally:
+            # Nettoyer fichier temporaire
+            temp_image.release()
                 
-                sse_manager.broadcast_complete(request_id, final_result)
-                logger.info(f"✅ Génération async terminée pour {request_id}")
-                
-            finally:
-                # Nettoyer fichier temporaire
-                try:
-                    import os
-                    os.unlink(temp_image_path)
-                except Exception:
-                    pass
-                    
  
-        except TimeoutError as e:
-            import traceback
-            logger.error(f"⏱️ Timeout génération async: {e}")
-            sse_manager.broadcast_error(request_id, f"Timeout: {str(e)}", "TIMEOUT")
-        except Exception as e:
-            import traceback
-            logger.error(f"❌ Erreur génération async: {e}")
-            logger.error(f"Traceback complet:\n{traceback.format_exc()}")
-            sse_manager.broadcast_error(request_id, str(e))
\ No newline at end of file
+    except TimeoutError as e:
+        logger.error(f"⏱️ Timeout génération async: {e}")
+        sse_manager.broadcast_error(request_id, f"Timeout: {str(e)}", "TIMEOUT")
+    except Exception as e:
+        # Trace complète seulement en DEBUG : évite le parcours de pile à chaque échec
+        logger.error(f"❌ Erreur génération async: {e}", exc_info=logger.isEnabledFor(logging.DEBUG))
+        sse_manager.broadcast_error(request_id, str(e))
\ No newline at end of file
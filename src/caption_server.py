@@ -13,29 +13,11 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 import logging
 import time
 
-# Import de la configuration
-from src.config.server_config import ServerConfig
-
-# Import des blueprints
-from src.api import api_bp, sse_bp, admin_bp
-
-# Import des services
-from src.services.geo_service import GeoService
-from src.services.ai_service import AIService
-from src.services.immich_api_service import ImmichAPIService
-from flask import Flask
-from flask import Flask
-from flask_cors import CORS
-import logging
-import time
-import sys
-from pathlib import Path
-
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -44,15 +26,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Import de la configuration
-from config.server_config import ServerConfig
+from src.config.server_config import ServerConfig
+from src.utils.json_utils import OrjsonProvider
 
 # Import des blueprints
-from api import api_bp, sse_bp, admin_bp
+from src.api import api_bp, sse_bp, admin_bp, start_health_monitor
 
 # Import des services
-from services.geo_service import GeoService
-from services.ai_service import AIService
-from services.immich_api_service import ImmichAPIService
+from src.services.geo_service import GeoService
+from src.services.ai_service import AIService
+from src.services.immich_api_service import ImmichAPIService
 
 
 def create_app():
@@ -64,9 +47,21 @@ def create_app():
     ServerConfig.ensure_directories()
     app.config.update(ServerConfig.get_flask_config())
     
+    # Sérialisation JSON rapide (orjson) pour jsonify
+    app.json = OrjsonProvider(app)
+    
     # Activer CORS
     CORS(app)
     
+    # Corps de requête au-delà de MAX_CONTENT_LENGTH (refusé avant lecture)
+    @app.errorhandler(413)
+    def request_too_large(error):
+        return jsonify({
+            'success': False,
+            'error': f"Requête trop volumineuse (max: {app.config['MAX_CONTENT_LENGTH']} bytes)",
+            'code': 'PAYLOAD_TOO_LARGE'
+        }), 413
+    
     # Enregistrer les blueprints
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(sse_bp, url_prefix='/api')
@@ -74,11 +69,12 @@ def create_app():
     
     # Stocker le temps de démarrage
     app.config['START_TIME'] = time.time()
+    
     # Debug : lister toutes les routes
-    print("\n📍 Routes enregistrées:")
-    for rule in app.url_map.iter_rules():
-        print(f"   {rule.endpoint}: {rule.rule}")
-    print()
+    if logger.isEnabledFor(logging.DEBUG):
+        for rule in app.url_map.iter_rules():
+            logger.debug(f"📍 Route {rule.endpoint}: {rule.rule}")
+    
     return app
 
 
@@ -90,12 +86,13 @@ def init_services(app):
         logger.info("🚀 Initialisation des services...")
         
         # Service de géolocalisation
-        geo_service = GeoService(ServerConfig.DB_CONFIG)
+        geo_service = GeoService(ServerConfig.DB_CONFIG, pool_size=ServerConfig.DB_POOL_SIZE)
         services['geo_service'] = geo_service
         logger.info("✅ GeoService initialisé")
         
         # Service IA
         ai_service = AIService(geo_service)
+        ai_service.warm_up()
         services['ai_service'] = ai_service
         logger.info("✅ AIService initialisé")
         
@@ -117,6 +114,11 @@ def init_services(app):
         
         # Stocker les services dans la config Flask
         app.config['SERVICES'] = services
+        # Accès direct au service IA (une seule lecture par requête)
+        app.config['AI_SERVICE'] = ai_service
+        
+        # Sondes DB / Ollama du health check hors du chemin des requêtes
+        start_health_monitor(services)
         
         logger.info("🎉 Tous les services initialisés avec succès")
         return True
@@ -126,6 +128,18 @@ def init_services(app):
         return False
 
 
+def create_wsgi_app():
+    """
+    Application complète pour un serveur WSGI de production (voir gunicorn_conf.py)
+    
+    Contrairement à create_app, initialise aussi les services
+    """
+    app = create_app()
+    if not init_services(app):
+        raise RuntimeError("Échec initialisation des services")
+    return app
+
+
 def generate_ssl_certificate():
     """Générer un certificat SSL auto-signé si nécessaire"""
     cert_path = Path(ServerConfig.CERT_FILE)
@@ -10,11 +10,96 @@ Permet modification à chaud sans recompilation
 import yaml
 import logging
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Any, Optional, List
 import re
 
+# Parseur C (libyaml) si PyYAML a été compilé avec, sinon parseur Python
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 logger = logging.getLogger(__name__)
 
+# Espaces consécutifs ramenés à un seul par clean_caption
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Mots signalant une métaphore, cherchés comme sous-chaînes en un seul passage
+_METAPHOR_PATTERN = re.compile(
+    '|'.join(re.escape(word) for word in ('comme', 'tel', 'ainsi', 'pareil', '似', 'like', 'as if')),
+    re.IGNORECASE
+)
+
+# Valeurs par défaut des sections (complétées par le YAML au chargement)
+# En lecture seule : certains getters les retournent telles quelles
+_DEFAULT_MODELS = MappingProxyType({
+    'vision': 'llava:7b',
+    'caption': 'mistral:7b-instruct',
+    'geo_enrichment': 'qwen2:7b'
+})
+
+_DEFAULT_OLLAMA = MappingProxyType({
+    'base_url': 'http://localhost:11434',
+    'timeout': 60,
+    'default_temperature': 0.7,
+    'max_retries': 3
+})
+
+_DEFAULT_IMAGE_ANALYSIS_PARAMS = MappingProxyType({
+    'temperature': 0.6,
+    'max_tokens': 200,
+    'top_p': 0.9
+})
+
+_DEFAULT_CULTURAL_ENRICHMENT_PARAMS = MappingProxyType({
+    'temperature': 0.5,
+    'max_tokens': 120,
+    'top_p': 0.8
+})
+
+_DEFAULT_POST_PROCESSING = MappingProxyType({
+    'max_caption_length': 500,
+    'min_caption_length': 20,
+    'max_sentences_if_too_long': 3,
+    'remove_patterns': ("^#.*$", "\\*{2,}", "_{2,}"),
+    'forbidden_words': ()
+})
+
+_DEFAULT_QUALITY_SCORING = MappingProxyType({
+    'weights': MappingProxyType({
+        'image_analysis': 0.3,
+        'geo_context': 0.4,
+        'caption_quality': 0.3
+    }),
+    'caption_quality_factors': MappingProxyType({
+        'min_words': 10,
+        'max_words': 150,
+        'ideal_words_min': 40,
+        'ideal_words_max': 120
+    })
+})
+
+_DEFAULT_SUPPORTED_LANGUAGES = (
+    MappingProxyType({'code': 'fr', 'names': ('français', 'fr'), 'template_key': 'captions_french'}),
+    MappingProxyType({'code': 'en', 'names': ('english', 'en'), 'template_key': 'captions_english'}),
+    MappingProxyType({'code': 'bilingual', 'names': ('bilingual', 'bilingue'), 'template_key': 'captions_bilingual'})
+)
+
+_DEFAULT_SUPPORTED_STYLES = (
+    MappingProxyType({'name': 'creative', 'description': 'Poétique et évocateur', 'default': True}),
+    MappingProxyType({'name': 'descriptive', 'description': 'Informatif et engageant'}),
+    MappingProxyType({'name': 'minimal', 'description': 'Court et percutant'})
+)
+
+_DEFAULT_DEBUG = MappingProxyType({
+    'log_prompts': False,
+    'log_responses': False,
+    'save_failed_generations': True,
+    'detailed_timing': False
+})
+
+
 class AIConfig:
     """Gestionnaire de configuration pour l'AIService"""
     
@@ -37,7 +122,7 @@ class AIConfig:
         """Charger la configuration depuis le fichier YAML"""
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                self._config = yaml.safe_load(f)
+                self._config = yaml.load(f, Loader=_YamlLoader)
             
             logger.info(f"✅ Configuration chargée depuis {self.config_path}")
             
@@ -52,6 +137,93 @@ class AIConfig:
         except Exception as e:
             logger.error(f"❌ Erreur chargement config: {e}")
             self._config = self._get_default_config()
+        
+        self._resolve_sections()
+    
+    def _resolve_sections(self):
+        """
+        Résoudre une fois par chargement les sections lues à chaque légende
+        
+        Chaque section du YAML complète ses valeurs par défaut : les getters
+        retournent ensuite ces attributs sans reconstruire de dictionnaire
+        """
+        # Fichier ou section vide (clé sans valeur) : chargé comme None par YAML
+        config = self._config or {}
+        self._models = {**_DEFAULT_MODELS, **(config.get('models') or {})}
+        self._ollama = {**_DEFAULT_OLLAMA, **(config.get('ollama') or {})}
+        self._post_processing = {**_DEFAULT_POST_PROCESSING, **(config.get('post_processing') or {})}
+        self._quality_scoring = {**_DEFAULT_QUALITY_SCORING, **(config.get('quality_scoring') or {})}
+        # Listes copiées (dictionnaires sérialisables par jsonify, défauts jamais exposés)
+        self._supported_languages = [
+            dict(lang) for lang in config.get('supported_languages') or _DEFAULT_SUPPORTED_LANGUAGES
+        ]
+        self._supported_styles = [
+            dict(style) for style in config.get('supported_styles') or _DEFAULT_SUPPORTED_STYLES
+        ]
+        self._debug = {**_DEFAULT_DEBUG, **(config.get('debug') or {})}
+        
+        # Sections imbriquées (prompts, paramètres, templates, fallbacks)
+        self._image_analysis = config.get('image_analysis') or {}
+        self._image_analysis_params = (
+            self._image_analysis.get('parameters') or _DEFAULT_IMAGE_ANALYSIS_PARAMS
+        )
+        self._cultural_enrichment = config.get('cultural_enrichment') or {}
+        self._cultural_enrichment_params = (
+            self._cultural_enrichment.get('parameters') or _DEFAULT_CULTURAL_ENRICHMENT_PARAMS
+        )
+        
+        # Templates de légende par code langue (défaut français)
+        self._caption_templates = {
+            'bilingual': config.get('captions_bilingual') or {},
+            'en': config.get('captions_english') or {},
+            'fr': config.get('captions_french') or {}
+        }
+        
+        fallbacks = config.get('fallback_messages') or {}
+        self._french_fallbacks = fallbacks.get('french') or {}
+        self._english_fallbacks = fallbacks.get('english') or {}
+        
+        # Nom de langue → code ('français' → 'fr'), le premier déclaré l'emporte
+        self._language_codes = {}
+        for lang_config in self._supported_languages:
+            for name in lang_config.get('names') or ():
+                self._language_codes.setdefault(name, lang_config.get('code', 'fr'))
+        
+        # Codes et styles acceptés, validés à chaque génération
+        self._valid_language_codes = frozenset(lang['code'] for lang in self._supported_languages)
+        self._valid_styles = frozenset(style['name'] for style in self._supported_styles)
+        
+        self._compile_post_processing()
+        self._resolve_quality_factors()
+    
+    def _resolve_quality_factors(self):
+        """Lire une fois les seuils et bonus du score de qualité"""
+        factors = self._quality_scoring.get('caption_quality_factors') or {}
+        self._min_words = factors.get('min_words', 10)
+        self._max_words = factors.get('max_words', 150)
+        self._ideal_words_min = factors.get('ideal_words_min', 40)
+        self._ideal_words_max = factors.get('ideal_words_max', 120)
+        self._penalty_hashtags = factors.get('penalty_hashtags', -0.2)
+        self._bonus_for_metaphors = factors.get('bonus_for_metaphors', 0.1)
+    
+    def _compile_post_processing(self):
+        """Compiler une fois les expressions de nettoyage des légendes"""
+        post_config = self._post_processing
+        
+        self._remove_patterns = []
+        for pattern in post_config.get('remove_patterns') or ():
+            try:
+                self._remove_patterns.append(re.compile(pattern, re.MULTILINE))
+            except re.error as e:
+                logger.error(f"❌ Pattern de nettoyage invalide ignoré {pattern!r}: {e}")
+        
+        self._forbidden_patterns = [
+            re.compile(re.escape(word), re.IGNORECASE)
+            for word in post_config.get('forbidden_words') or ()
+        ]
+        
+        self._max_caption_length = post_config.get('max_caption_length', 500)
+        self._max_sentences_if_too_long = post_config.get('max_sentences_if_too_long', 3)
     
     def reload_config(self):
         """Recharger la configuration depuis le fichier"""
@@ -64,20 +236,11 @@ class AIConfig:
     
     def get_models(self) -> Dict[str, str]:
         """Récupérer la configuration des modèles"""
-        return self._config.get('models', {
-            'vision': 'llava:7b',
-            'caption': 'mistral:7b-instruct',
-            'geo_enrichment': 'qwen2:7b'
-        })
+        return self._models
     
     def get_ollama_config(self) -> Dict[str, Any]:
         """Récupérer la configuration Ollama"""
-        return self._config.get('ollama', {
-            'base_url': 'http://localhost:11434',
-            'timeout': 60,
-            'default_temperature': 0.7,
-            'max_retries': 3
-        })
+        return self._ollama
     
     # =================================================================
     # GETTERS POUR PROMPTS
@@ -85,7 +248,7 @@ class AIConfig:
     
     def get_image_analysis_prompt(self, detailed: bool = False) -> str:
         """Récupérer le prompt d'analyse d'image"""
-        image_config = self._config.get('image_analysis', {})
+        image_config = self._image_analysis
         
         if detailed:
             return image_config.get('detailed_prompt', image_config.get('main_prompt', ''))
@@ -94,11 +257,7 @@ class AIConfig:
     
     def get_image_analysis_params(self) -> Dict[str, Any]:
         """Récupérer les paramètres pour l'analyse d'image"""
-        return self._config.get('image_analysis', {}).get('parameters', {
-            'temperature': 0.6,
-            'max_tokens': 200,
-            'top_p': 0.9
-        })
+        return self._image_analysis_params
     
     def get_caption_prompt(self, language: str, style: str = 'creative') -> str:
         """
@@ -108,23 +267,17 @@ class AIConfig:
             language: Code langue ('fr', 'en', 'bilingual')
             style: Style de légende ('creative', 'descriptive', 'minimal')
         """
-        # Normaliser la langue
-        lang_code = self._normalize_language(language)
-        
-        # Chercher le template approprié
-        if lang_code == 'bilingual':
-            templates = self._config.get('captions_bilingual', {})
-        elif lang_code == 'en':
-            templates = self._config.get('captions_english', {})
-        else:  # défaut français
-            templates = self._config.get('captions_french', {})
+        # Normaliser la langue et chercher le template approprié (défaut français)
+        templates = self._caption_templates.get(
+            self._normalize_language(language), self._caption_templates['fr']
+        )
         
         # Récupérer le style demandé (défaut creative)
         return templates.get(style, templates.get('creative', 'Écris une légende pour cette photo.'))
     
     def get_cultural_enrichment_prompt(self, short: bool = False) -> str:
         """Récupérer le prompt d'enrichissement culturel"""
-        cultural_config = self._config.get('cultural_enrichment', {})
+        cultural_config = self._cultural_enrichment
         
         if short:
             return cultural_config.get('short_prompt', cultural_config.get('main_prompt', ''))
@@ -133,54 +286,31 @@ class AIConfig:
     
     def get_cultural_enrichment_params(self) -> Dict[str, Any]:
         """Récupérer les paramètres pour l'enrichissement culturel"""
-        return self._config.get('cultural_enrichment', {}).get('parameters', {
-            'temperature': 0.5,
-            'max_tokens': 120,
-            'top_p': 0.8
-        })
+        return self._cultural_enrichment_params
     
     # =================================================================
     # UTILITAIRES LANGUE ET STYLE
     # =================================================================
     
     def _normalize_language(self, language: str) -> str:
-        """Normaliser le code langue"""
-        language = language.lower().strip()
-        
-        supported_langs = self._config.get('supported_languages', [])
-        
-        for lang_config in supported_langs:
-            if language in lang_config.get('names', []):
-                return lang_config.get('code', 'fr')
-        
-        # Défaut français
-        return 'fr'
+        """Normaliser le code langue (défaut français)"""
+        return self._language_codes.get(language.lower().strip(), 'fr')
     
     def get_supported_languages(self) -> List[Dict[str, Any]]:
         """Récupérer la liste des langues supportées"""
-        return self._config.get('supported_languages', [
-            {'code': 'fr', 'names': ['français', 'fr'], 'template_key': 'captions_french'},
-            {'code': 'en', 'names': ['english', 'en'], 'template_key': 'captions_english'},
-            {'code': 'bilingual', 'names': ['bilingual', 'bilingue'], 'template_key': 'captions_bilingual'}
-        ])
+        return self._supported_languages
     
     def get_supported_styles(self) -> List[Dict[str, Any]]:
         """Récupérer la liste des styles supportés"""
-        return self._config.get('supported_styles', [
-            {'name': 'creative', 'description': 'Poétique et évocateur', 'default': True},
-            {'name': 'descriptive', 'description': 'Informatif et engageant'},
-            {'name': 'minimal', 'description': 'Court et percutant'}
-        ])
+        return self._supported_styles
     
     def is_valid_language(self, language: str) -> bool:
         """Vérifier si une langue est supportée"""
-        normalized = self._normalize_language(language)
-        return normalized in [lang['code'] for lang in self.get_supported_languages()]
+        return self._normalize_language(language) in self._valid_language_codes
     
     def is_valid_style(self, style: str) -> bool:
         """Vérifier si un style est supporté"""
-        styles = [s['name'] for s in self.get_supported_styles()]
-        return style.lower() in styles
+        return style.lower() in self._valid_styles
     
     # =================================================================
     # POST-PROCESSING ET FALLBACKS
@@ -188,13 +318,7 @@ class AIConfig:
     
     def get_post_processing_config(self) -> Dict[str, Any]:
         """Récupérer la configuration de post-processing"""
-        return self._config.get('post_processing', {
-            'max_caption_length': 500,
-            'min_caption_length': 20,
-            'max_sentences_if_too_long': 3,
-            'remove_patterns': ["^#.*$", "\\*{2,}", "_{2,}"],
-            'forbidden_words': []
-        })
+        return self._post_processing
     
     def get_fallback_message(self, language: str, message_type: str) -> str:
         """
@@ -204,28 +328,16 @@ class AIConfig:
             language: Code langue
             message_type: Type de message ('no_image', 'no_location', 'generic_error')
         """
-        lang_code = self._normalize_language(language)
-        
-        fallbacks = self._config.get('fallback_messages', {})
-        lang_fallbacks = fallbacks.get('french' if lang_code == 'fr' else 'english', {})
+        if self._normalize_language(language) == 'fr':
+            lang_fallbacks = self._french_fallbacks
+        else:
+            lang_fallbacks = self._english_fallbacks
         
         return lang_fallbacks.get(message_type, 'Une belle photo capturée dans un moment unique.')
     
     def get_quality_scoring_config(self) -> Dict[str, Any]:
         """Récupérer la configuration du scoring de qualité"""
-        return self._config.get('quality_scoring', {
-            'weights': {
-                'image_analysis': 0.3,
-                'geo_context': 0.4,
-                'caption_quality': 0.3
-            },
-            'caption_quality_factors': {
-                'min_words': 10,
-                'max_words': 150,
-                'ideal_words_min': 40,
-                'ideal_words_max': 120
-            }
-        })
+        return self._quality_scoring
     
     # =================================================================
     # POST-PROCESSING HELPERS
@@ -236,25 +348,30 @@ class AIConfig:
         if not caption:
             return caption
         
-        post_config = self.get_post_processing_config()
-        
-        # Supprimer les patterns indésirables
-        for pattern in post_config.get('remove_patterns', []):
-            caption = re.sub(pattern, '', caption, flags=re.MULTILINE)
+        # Supprimer les patterns indésirables (compilés au chargement)
+        for pattern in self._remove_patterns:
+            caption = pattern.sub('', caption)
         
         # Supprimer les mots interdits
-        for word in post_config.get('forbidden_words', []):
-            caption = re.sub(re.escape(word), '', caption, flags=re.IGNORECASE)
+        for pattern in self._forbidden_patterns:
+            caption = pattern.sub('', caption)
         
         # Nettoyer les espaces
-        caption = re.sub(r'\s+', ' ', caption).strip()
-        
-        # Limiter la longueur
-        max_length = post_config.get('max_caption_length', 500)
-        if len(caption) > max_length:
-            sentences = caption.split('.')
-            max_sentences = post_config.get('max_sentences_if_too_long', 3)
-            caption = '. '.join(sentences[:max_sentences]) + '.'
+        caption = _WHITESPACE_PATTERN.sub(' ', caption).strip()
+        
+        # Limiter la longueur : couper après la N-ième phrase (sans découper toute la légende)
+        if len(caption) > self._max_caption_length:
+            end = -1
+            for _ in range(self._max_sentences_if_too_long):
+                end = caption.find('.', end + 1)
+                if end == -1:
+                    break
+            
+            if end != -1:
+                caption = caption[:end + 1]
+            elif not caption.endswith('.'):
+                # Moins de N phrases : tout garder, terminer par un point
+                caption += '.'
         
         return caption
     
@@ -263,35 +380,26 @@ class AIConfig:
         if not caption:
             return 0.0
         
-        quality_config = self.get_quality_scoring_config()
-        factors = quality_config.get('caption_quality_factors', {})
-        
         words = len(caption.split())
         score = 0.5  # Score de base
         
-        # Score basé sur la longueur
-        min_words = factors.get('min_words', 10)
-        max_words = factors.get('max_words', 150)
-        ideal_min = factors.get('ideal_words_min', 40)
-        ideal_max = factors.get('ideal_words_max', 120)
-        
-        if words < min_words:
+        # Score basé sur la longueur (seuils lus au chargement)
+        if words < self._min_words:
             score -= 0.3
-        elif words > max_words:
+        elif words > self._max_words:
             score -= 0.2
-        elif ideal_min <= words <= ideal_max:
+        elif self._ideal_words_min <= words <= self._ideal_words_max:
             score += 0.3
         else:
             score += 0.1
         
         # Bonus/Malus basés sur le contenu
         if '#' in caption:
-            score += factors.get('penalty_hashtags', -0.2)
+            score += self._penalty_hashtags
         
         # Chercher des métaphores/richesse (approximatif)
-        metaphor_words = ['comme', 'tel', 'ainsi', 'pareil', '似', 'like', 'as if']
-        if any(word in caption.lower() for word in metaphor_words):
-            score += factors.get('bonus_for_metaphors', 0.1)
+        if _METAPHOR_PATTERN.search(caption):
+            score += self._bonus_for_metaphors
         
         return max(0.0, min(1.0, score))
     
@@ -301,12 +409,7 @@ class AIConfig:
     
     def get_debug_config(self) -> Dict[str, bool]:
         """Récupérer la configuration de debug"""
-        return self._config.get('debug', {
-            'log_prompts': False,
-            'log_responses': False,
-            'save_failed_generations': True,
-            'detailed_timing': False
-        })
+        return self._debug
     
     def export_config_summary(self) -> Dict[str, Any]:
         """Exporter un résumé de la configuration pour debug"""
@@ -21,6 +21,7 @@ class ServerConfig:
         'database': 'immich_gallery',
         'charset': 'utf8mb4'
     }
+    DB_POOL_SIZE = 10  # recalculé par load_from_env (générations sync + async + sonde health check)
     
     # Immich API
     IMMICH_PROXY_URL = "http://localhost:3001"
@@ -39,8 +40,16 @@ class ServerConfig:
     
     # Limites et timeouts
     MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
+    MAX_JSON_OVERHEAD = 16 * 1024  # champs JSON autour de l'image (légende existante...)
     MAX_CONCURRENT_REQUESTS = 5
     REQUEST_TIMEOUT = 300  # 5 minutes
+    HEALTH_CHECK_TTL = 5  # secondes entre deux sondes DB/Ollama
+    MAX_CONCURRENT_REGENERATIONS = 2  # slots Ollama réservés à la régénération
+    REGENERATE_TIMEOUT = 60  # secondes
+    MAX_ASYNC_WORKERS = 4  # générations SSE traitées en parallèle
+    MAX_ASYNC_QUEUE = 16  # générations SSE en attente avant refus (503)
+    JOB_RESULT_TTL = 3600  # secondes de conservation d'une tâche /ai/jobs
+    MAX_JOBS = 1024  # tâches /ai/jobs conservées (les plus anciennes évincées)
     
     # Cache
     CACHE_TTL = 3600  # 1 heure
@@ -51,50 +60,66 @@ class ServerConfig:
     TEMP_FILE_MAX_AGE_HOURS = 24
     
     # SSE (Server-Sent Events)
-    SSE_HEARTBEAT_INTERVAL = 30  # secondes
-    SSE_MESSAGE_TIMEOUT = 1.0    # timeout queue
+    SSE_HEARTBEAT_INTERVAL = 30  # secondes sans message avant heartbeat
     
     # Logging
     LOG_LEVEL = 'INFO'
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     LOG_FILE = 'logs/caption_server.log'
     
+    # Résumé servi par /ai/stats, recalculé après chaque chargement
+    _summary = None
+    
     @classmethod
     def load_from_env(cls):
         """Charger la configuration depuis les variables d'environnement"""
         import os
         
+        cls._summary = None
+        env = os.environ
+        
         # Base de données
-        if os.getenv('DB_HOST'):
-            cls.DB_CONFIG['host'] = os.getenv('DB_HOST')
-        if os.getenv('DB_USER'):
-            cls.DB_CONFIG['user'] = os.getenv('DB_USER')
-        if os.getenv('DB_PASSWORD'):
-            cls.DB_CONFIG['password'] = os.getenv('DB_PASSWORD')
-        if os.getenv('DB_NAME'):
-            cls.DB_CONFIG['database'] = os.getenv('DB_NAME')
+        if value := env.get('DB_HOST'):
+            cls.DB_CONFIG['host'] = value
+        if value := env.get('DB_USER'):
+            cls.DB_CONFIG['user'] = value
+        if value := env.get('DB_PASSWORD'):
+            cls.DB_CONFIG['password'] = value
+        if value := env.get('DB_NAME'):
+            cls.DB_CONFIG['database'] = value
         
         # Immich
-        if os.getenv('IMMICH_PROXY_URL'):
-            cls.IMMICH_PROXY_URL = os.getenv('IMMICH_PROXY_URL')
-        if os.getenv('IMMICH_API_KEY'):
-            cls.IMMICH_API_KEY = os.getenv('IMMICH_API_KEY')
+        if value := env.get('IMMICH_PROXY_URL'):
+            cls.IMMICH_PROXY_URL = value
+        if value := env.get('IMMICH_API_KEY'):
+            cls.IMMICH_API_KEY = value
         
         # Serveur
-        if os.getenv('SERVER_HOST'):
-            cls.HOST = os.getenv('SERVER_HOST')
-        if os.getenv('SERVER_PORT'):
-            cls.PORT = int(os.getenv('SERVER_PORT'))
-        if os.getenv('SERVER_DEBUG'):
-            cls.DEBUG = os.getenv('SERVER_DEBUG').lower() == 'true'
+        if value := env.get('SERVER_HOST'):
+            cls.HOST = value
+        if value := env.get('SERVER_PORT'):
+            cls.PORT = int(value)
+        if value := env.get('SERVER_DEBUG'):
+            cls.DEBUG = value.lower() == 'true'
         
         # HTTPS
-        if os.getenv('USE_HTTPS'):
-            cls.USE_HTTPS = os.getenv('USE_HTTPS').lower() == 'true'
+        if value := env.get('USE_HTTPS'):
+            cls.USE_HTTPS = value.lower() == 'true'
+        
+        # Générations asynchrones
+        if value := env.get('CAPTION_MAX_WORKERS'):
+            cls.MAX_ASYNC_WORKERS = int(value)
+        
+        # Pool MySQL : une connexion par génération sync/async simultanée + la sonde health check
+        # (mysql-connector refuse plus de 32 connexions par pool)
+        if value := env.get('DB_POOL_SIZE'):
+            cls.DB_POOL_SIZE = int(value)
+        else:
+            cls.DB_POOL_SIZE = min(cls.MAX_CONCURRENT_REQUESTS + cls.MAX_ASYNC_WORKERS + 1, 32)
         
         # Cache
-        if os.getenv('CACHE_TTL'):
-            cls.CACHE_TTL = int(os.getenv('CACHE_TTL'))
+        if value := env.get('CACHE_TTL'):
+            cls.CACHE_TTL = int(value)
     
     @classmethod
     def load_from_file(cls, config_file: str = 'config/local_config.json'):
@@ -110,6 +135,8 @@ class ServerConfig:
             for key, value in config.items():
                 if hasattr(cls, key):
                     setattr(cls, key, value)
+            
+            cls._summary = None
     
     @classmethod
     def get_flask_config(cls) -> Dict[str, Any]:
@@ -117,7 +144,8 @@ class ServerConfig:
         return {
             'DEBUG': cls.DEBUG,
             'SECRET_KEY': 'dev-key-change-in-production',
-            'MAX_CONTENT_LENGTH': cls.MAX_IMAGE_SIZE,
+            # Image en base64 (+33%) + champs JSON : refus 413 dès l'en-tête Content-Length
+            'MAX_CONTENT_LENGTH': cls.MAX_IMAGE_SIZE * 4 // 3 + cls.MAX_JSON_OVERHEAD,
             'JSON_AS_ASCII': False,
             'JSON_SORT_KEYS': False
         }
@@ -137,7 +165,14 @@ class ServerConfig:
     
     @classmethod
     def summary(cls) -> Dict[str, Any]:
-        """Résumé de la configuration pour debug"""
+        """Résumé de la configuration pour debug (calculé une fois par chargement)"""
+        if cls._summary is None:
+            cls._summary = cls._build_summary()
+        return cls._summary
+    
+    @classmethod
+    def _build_summary(cls) -> Dict[str, Any]:
+        """Construire le résumé de la configuration"""
         return {
             'server': {
                 'host': cls.HOST,
@@ -8,26 +8,19 @@ Utilise configuration externalisée pour flexibilité maximale
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import logging
 import time
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Union
 from pathlib import Path
 from datetime import datetime
 import base64
 from dataclasses import dataclass
-import sys
 
-# Import du gestionnaire de config et GeoService
-sys.path.append(str(Path(__file__).parent.parent))
-from config.ai_config import AIConfig
-
-# Import GeoService (relatif ou absolu selon contexte)
-try:
-    from .geo_service import GeoService, GeoLocation
-except ImportError:
-    # Fallback pour exécution directe
-    from geo_service import GeoService, GeoLocation
+# Import du gestionnaire de config et GeoService (via le package : python -m pour l'exécution directe)
+from ..config.ai_config import AIConfig
+from .geo_service import GeoService, GeoLocation
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +63,9 @@ class AIService:
     4. Post-traitement selon configuration
     """
     
+    # Connexions HTTP conservées vers Ollama (workers IA + générations async)
+    OLLAMA_POOL_SIZE = 10
+    
     def __init__(self, geo_service: GeoService, config_path: Optional[str] = None):
         """
         Initialiser le service IA
@@ -90,6 +86,11 @@ class AIService:
         self.default_temperature = ollama_config['default_temperature']
         self.max_retries = ollama_config['max_retries']
         
+        # Session HTTP persistante : connexions keep-alive vers Ollama réutilisées
+        self.http = requests.Session()
+        self.http.mount('http://', HTTPAdapter(pool_maxsize=self.OLLAMA_POOL_SIZE))
+        self.http.mount('https://', HTTPAdapter(pool_maxsize=self.OLLAMA_POOL_SIZE))
+        
         # Modèles depuis configuration
         self.models = self.config.get_models()
         
@@ -107,18 +108,28 @@ class AIService:
             'styles_used': {}
         }
         
-        logger.info(f"🤖 AIService initialisé avec config: {self.config.export_config_summary()}")
+        # Liste des modèles Ollama mémorisée (change rarement)
+        self._models_cache = None
+        self._models_cache_expires_at = 0.0
+        
+        # Options et résumé de configuration : ne changent qu'au rechargement
+        self._supported_options = None
+        self._config_summary = None
+        
+        logger.info(f"🤖 AIService initialisé avec config: {self._get_config_summary()}")
     
-    def generate_caption(self, image_path: str, latitude: Optional[float], longitude: Optional[float],
-                        language: str = 'français', style: str = 'creative') -> CaptionResult:
+    def generate_caption(self, image_path: Optional[str], latitude: Optional[float], longitude: Optional[float],
+                        language: str = 'français', style: str = 'creative',
+                        image_bytes: Optional[bytes] = None) -> CaptionResult:
         """
         Génération complète de légende contextuelle
         
         Args:
-            image_path: Chemin vers l'image à analyser
+            image_path: Chemin vers l'image à analyser (None si image_bytes est fourni)
             latitude, longitude: Coordonnées GPS (peuvent être None)
             language: Langue de génération (voir config pour langues supportées)
             style: Style de légende (voir config pour styles supportés)
+            image_bytes: Contenu de l'image déjà en mémoire (évite le fichier temporaire)
             
         Returns:
             CaptionResult avec légende et métadonnées complètes
@@ -142,17 +153,19 @@ class AIService:
         self.stats['styles_used'][style] = self.stats['styles_used'].get(style, 0) + 1
         
         # Log avec gestion des None
+        image_name = Path(image_path).name if image_bytes is None else f"image en mémoire ({len(image_bytes):,} bytes)"
         if latitude is not None and longitude is not None:
-            logger.info(f"🎨 Génération légende pour {Path(image_path).name} ({latitude:.4f}, {longitude:.4f})")
+            logger.info(f"🎨 Génération légende pour {image_name} ({latitude:.4f}, {longitude:.4f})")
         else:
-            logger.info(f"🎨 Génération légende pour {Path(image_path).name} (sans géolocalisation)")
+            logger.info(f"🎨 Génération légende pour {image_name} (sans géolocalisation)")
         logger.info(f"   Paramètres: {language} / {style}")
         
         try:
-            # 1. Vérifier que l'image existe
-            image_path = Path(image_path)
-            if not image_path.exists():
-                raise FileNotFoundError(f"Image non trouvée: {image_path}")
+            # 1. Vérifier que l'image existe (sauf image déjà en mémoire)
+            if image_bytes is None:
+                image_path = Path(image_path)
+                if not image_path.exists():
+                    raise FileNotFoundError(f"Image non trouvée: {image_path}")
             
             processing_steps.append("✅ Image validée")
             
@@ -168,7 +181,9 @@ class AIService:
             
             # 2. Analyse visuelle avec LLaVA
             logger.info("   🔍 Analyse visuelle...")
-            image_analysis = self._analyze_image_with_llava(image_path, prompts_used)
+            image_analysis = self._analyze_image_with_llava(
+                image_path if image_bytes is None else image_bytes, prompts_used
+            )
             intermediate_results['image_analysis_raw'] = {
                 'description': image_analysis['description'],
                 'confidence': image_analysis['confidence'],
@@ -214,25 +229,18 @@ class AIService:
                     intermediate_results['cultural_enrichment_raw'] = cultural_enrichment_text
                     processing_steps.append("✅ Enrichissement culturel ajouté")
             
-            # 5. Contexte final pour l'IA
-            final_ai_context = {
-                'image_description': image_analysis['description'],
-                'location_basic': enriched_context.get('location_basic', 'lieu inconnu'),
-                'cultural_context': enriched_context.get('cultural_context', ''),
-                'nearby_attractions': enriched_context.get('nearby_attractions', ''),
-                'cultural_enrichment': enriched_context.get('cultural_enrichment', ''),
-                'geographic_context': enriched_context.get('geographic_context', '')
-            }
+            # 5. Contexte final pour l'IA (aussi données du template de légende)
+            final_ai_context = self._build_caption_context(image_analysis['description'], enriched_context)
             intermediate_results['final_context_for_ai'] = final_ai_context
             
             # 6. Génération de la légende créative
             logger.info("   ✍️ Génération créative...")
-            caption = self._generate_creative_caption(
-                image_analysis['description'], 
-                enriched_context, 
+            caption = self._generate_caption_from_context(
+                final_ai_context,
                 language,
                 style,
-                prompts_used
+                prompts_used,
+                enriched_context.get('location_basic', 'ce lieu')
             )
             intermediate_results['caption_raw'] = caption
             processing_steps.append("✅ Légende générée")
@@ -272,8 +280,8 @@ class AIService:
             return self._handle_generation_error(e, language, latitude, longitude, 
                                                start_time, processing_steps, prompts_used)
     
-    def _analyze_image_with_llava(self, image_path: Path, prompts_used: Dict[str, str]) -> Dict[str, Any]:
-        """Analyser l'image avec le modèle LLaVA"""
+    def _analyze_image_with_llava(self, image: Union[Path, str, bytes], prompts_used: Dict[str, str]) -> Dict[str, Any]:
+        """Analyser l'image (chemin ou contenu binaire) avec le modèle LLaVA"""
         try:
             # Récupérer le prompt depuis la config
             prompt = self.config.get_image_analysis_prompt(detailed=False)
@@ -282,9 +290,12 @@ class AIService:
             if self.debug_config.get('log_prompts'):
                 prompts_used['image_analysis'] = prompt
             
-            # Encoder l'image en base64
-            with open(image_path, 'rb') as image_file:
-                image_base64 = base64.b64encode(image_file.read()).decode('utf-8')
+            # Encoder l'image en base64 (lue sur disque si on reçoit un chemin)
+            if isinstance(image, bytes):
+                image_base64 = base64.b64encode(image).decode('ascii')
+            else:
+                with open(image, 'rb') as image_file:
+                    image_base64 = base64.b64encode(image_file.read()).decode('ascii')
             
             # Préparer la requête Ollama
             payload = {
@@ -313,7 +324,7 @@ class AIService:
             self.stats['models_usage'][self.models['vision']] += 1
             
             if self.debug_config.get('log_responses'):
-                logger.debug(f"LLaVA response: {description}")
+                logger.debug("LLaVA response: %s", description)
             
             return {
                 'description': description,
@@ -361,7 +372,7 @@ class AIService:
                 self.stats['models_usage'][self.models['geo_enrichment']] += 1
                 
                 if self.debug_config.get('log_responses'):
-                    logger.debug(f"Cultural enrichment: {response[:100]}...")
+                    logger.debug("Cultural enrichment: %.100s...", response)
                 
                 return response.strip()
             
@@ -371,23 +382,40 @@ class AIService:
             logger.warning(f"Erreur enrichissement culturel: {e}")
             return None
     
+    @staticmethod
+    def _build_caption_context(image_description: str, geo_context: Dict[str, str]) -> Dict[str, str]:
+        """Données du template de légende à partir de la description et du contexte géo"""
+        return {
+            'image_description': image_description,
+            'location_basic': geo_context.get('location_basic', 'lieu inconnu'),
+            'cultural_context': geo_context.get('cultural_context', ''),
+            'nearby_attractions': geo_context.get('nearby_attractions', ''),
+            'cultural_enrichment': geo_context.get('cultural_enrichment', ''),
+            'geographic_context': geo_context.get('geographic_context', '')
+        }
+    
     def _generate_creative_caption(self, image_description: str, geo_context: Dict[str, str],
                                  language: str, style: str, prompts_used: Dict[str, str]) -> str:
         """Générer la légende créative avec le modèle configuré"""
+        return self._generate_caption_from_context(
+            self._build_caption_context(image_description, geo_context),
+            language, style, prompts_used,
+            geo_context.get('location_basic', 'ce lieu')
+        )
+    
+    def _generate_caption_from_context(self, template_data: Dict[str, str], language: str,
+                                       style: str, prompts_used: Dict[str, str],
+                                       fallback_location: str) -> str:
+        """
+        Générer la légende créative à partir des données de template déjà construites
+        
+        fallback_location : lieu du message de repli en cas d'erreur ('ce lieu' si le
+        contexte géo n'en donne pas, alors que le prompt utilise 'lieu inconnu')
+        """
         try:
             # Récupérer le template depuis la config
             prompt_template = self.config.get_caption_prompt(language, style)
             
-            # Préparer les données pour le template
-            template_data = {
-                'image_description': image_description,
-                'location_basic': geo_context.get('location_basic', 'lieu inconnu'),
-                'cultural_context': geo_context.get('cultural_context', ''),
-                'nearby_attractions': geo_context.get('nearby_attractions', ''),
-                'cultural_enrichment': geo_context.get('cultural_enrichment', ''),
-                'geographic_context': geo_context.get('geographic_context', '')
-            }
-            
             # Formatter le prompt
             formatted_prompt = prompt_template.format(**template_data)
             
@@ -408,7 +436,7 @@ class AIService:
             self.stats['models_usage'][self.models['caption']] += 1
             
             if self.debug_config.get('log_responses'):
-                logger.debug(f"Generated caption: {caption[:100]}...")
+                logger.debug("Generated caption: %.100s...", caption)
             
             return caption.strip()
             
@@ -416,7 +444,7 @@ class AIService:
             logger.error(f"Erreur génération créative: {e}")
             # Fallback depuis la config
             return self.config.get_fallback_message(language, 'generic_error').format(
-                location_basic=geo_context.get('location_basic', 'ce lieu')
+                location_basic=fallback_location
             )
     
     def _call_ollama_text(self, model: str, prompt: str, max_tokens: int = 150, 
@@ -445,7 +473,7 @@ class AIService:
                 # Timeout plus court pour détecter les blocages
                 timeout = min(self.ollama_timeout, 30)  # Max 30s par tentative
                 
-                response = requests.post(
+                response = self.http.post(
                     f"{self.ollama_base_url}/api/{endpoint}",
                     json=payload,
                     timeout=timeout
@@ -545,7 +573,7 @@ class AIService:
                 'timestamp': datetime.now().isoformat(),
                 'error': error_msg,
                 'language': language,
-                'coordinates': [latitude, longitude] if latitude and longitude else None,
+                'coordinates': [latitude, longitude] if latitude is not None and longitude is not None else None,
                 'prompts_used': prompts_used
             }
             
@@ -574,36 +602,76 @@ class AIService:
         self.models = self.config.get_models()
         self.debug_config = self.config.get_debug_config()
         
+        # Invalider ce qui dépend de la configuration (modèles configurés compris)
+        self._supported_options = None
+        self._config_summary = None
+        self._models_cache = None
+        
         logger.info("✅ Configuration rechargée")
     
-    def get_available_models(self) -> Dict[str, List[str]]:
-        """Récupérer la liste des modèles Ollama disponibles"""
+    # Durée de validité de la liste des modèles Ollama (secondes)
+    MODELS_CACHE_TTL = 60
+    
+    def get_available_models(self, use_cache: bool = True) -> Dict[str, List[str]]:
+        """
+        Récupérer la liste des modèles Ollama disponibles
+        
+        Args:
+            use_cache: Réutiliser la dernière réponse réussie pendant MODELS_CACHE_TTL
+        """
+        now = time.monotonic()
+        if use_cache and self._models_cache is not None and now < self._models_cache_expires_at:
+            return self._models_cache
+        
         try:
-            response = requests.get(f"{self.ollama_base_url}/api/tags", timeout=10)
+            response = self.http.get(f"{self.ollama_base_url}/api/tags", timeout=10)
             response.raise_for_status()
             
             data = response.json()
             available_models = [model['name'] for model in data.get('models', [])]
             configured_models = list(self.models.values())
             
-            return {
+            models_status = {
                 'available': available_models,
                 'configured': configured_models,
                 'missing': [model for model in configured_models if model not in available_models]
             }
             
+            # Seules les réponses réussies sont mémorisées
+            self._models_cache = models_status
+            self._models_cache_expires_at = now + self.MODELS_CACHE_TTL
+            return models_status
+            
         except Exception as e:
             logger.error(f"Erreur récupération modèles: {e}")
             return {'available': [], 'configured': list(self.models.values()), 'error': str(e)}
     
+    def warm_up(self):
+        """Ouvrir la connexion vers Ollama au démarrage (et remplir le cache des modèles)"""
+        models_status = self.get_available_models(use_cache=False)
+        if 'error' in models_status:
+            logger.warning(f"⚠️  Préchauffage Ollama impossible: {models_status['error']}")
+        else:
+            logger.info(f"🔥 Connexion Ollama préchauffée ({len(models_status['available'])} modèles)")
+    
     def get_supported_options(self) -> Dict[str, List[str]]:
-        """Récupérer les options supportées (langues, styles)"""
-        return {
-            'languages': [lang['code'] for lang in self.config.get_supported_languages()],
-            'styles': [style['name'] for style in self.config.get_supported_styles()],
-            'language_details': self.config.get_supported_languages(),
-            'style_details': self.config.get_supported_styles()
-        }
+        """Récupérer les options supportées (langues, styles), calculées une fois par configuration"""
+        if self._supported_options is None:
+            languages = self.config.get_supported_languages()
+            styles = self.config.get_supported_styles()
+            self._supported_options = {
+                'languages': [lang['code'] for lang in languages],
+                'styles': [style['name'] for style in styles],
+                'language_details': languages,
+                'style_details': styles
+            }
+        return self._supported_options
+    
+    def _get_config_summary(self) -> Dict[str, Any]:
+        """Résumé de configuration, calculé une fois par configuration"""
+        if self._config_summary is None:
+            self._config_summary = self.config.export_config_summary()
+        return self._config_summary
     
     def get_stats(self) -> Dict[str, Any]:
         """Retourner les statistiques d'utilisation détaillées"""
@@ -614,7 +682,7 @@ class AIService:
             'success_rate': (self.stats['successful_generations'] / total_requests * 100),
             'failure_rate': (self.stats['failed_generations'] / total_requests * 100),
             'models_configured': self.models,
-            'config_summary': self.config.export_config_summary(),
+            'config_summary': self._get_config_summary(),
             'geo_service_cache': self.geo_service.get_cache_stats()
         }
     
@@ -626,15 +694,15 @@ class AIService:
         config_valid = True
         config_issues = []
         
-        # Vérifier les modèles disponibles
-        models_status = self.get_available_models()
+        # Vérifier les modèles disponibles (sans cache : test explicite)
+        models_status = self.get_available_models(use_cache=False)
         if models_status.get('missing'):
             config_issues.append(f"Modèles manquants: {models_status['missing']}")
             config_valid = False
         
         # Vérifier la connectivité Ollama
         try:
-            requests.get(f"{self.ollama_base_url}/api/tags", timeout=5)
+            self.http.get(f"{self.ollama_base_url}/api/tags", timeout=5)
         except Exception as e:
             config_issues.append(f"Ollama inaccessible: {e}")
             config_valid = False
@@ -704,7 +772,7 @@ class AIService:
             raise
 
 
-# Exemple d'utilisation et tests
+# Exemple d'utilisation et tests (depuis la racine : python -m src.services.ai_service)
 if __name__ == "__main__":
     import sys
     import logging
@@ -717,8 +785,6 @@ if __name__ == "__main__":
     
     try:
         # Configuration de test pour GeoService
-        from geo_service import GeoService
-        
         db_config = {
             'host': 'localhost',
             'user': 'root',
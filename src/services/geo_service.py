@@ -8,7 +8,11 @@ Optimisé pour génération de légendes contextuelles
 """
 
 import mysql.connector
+import mysql.connector.pooling
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
 import time
 import logging
 from typing import Dict, List, Optional, Tuple, Any
@@ -16,9 +20,30 @@ from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import json
 import hashlib
+from math import radians, cos, sin, asin, sqrt
+
+from ..utils.cache_manager import CacheManager
 
 logger = logging.getLogger(__name__)
 
+# Codes GeoNames → type de ville lisible (défaut : 'localite')
+_CITY_TYPES = {
+    'PPLC': 'capitale',
+    'PPLA': 'centre_administratif',
+    'PPLA2': 'chef_lieu_region',
+    'PPLA3': 'chef_lieu_district',
+    'PPL': 'ville'
+}
+
+# Codes GeoNames des sites culturels, par bonus de pertinence
+_MAJOR_CULTURAL_CODES = frozenset(('HSTS', 'MUS', 'MNM'))
+_NOTABLE_CULTURAL_CODES = frozenset(('TMPL', 'PAL'))
+
+# Tags Overpass qui augmentent la pertinence d'un POI
+_ATTRACTION_TOURISM_TAGS = frozenset(('attraction', 'museum', 'monument'))
+_NOTABLE_NATURAL_TAGS = frozenset(('peak', 'beach', 'bay'))
+_POI_DETAIL_TAGS = frozenset(('cuisine', 'website', 'opening_hours'))
+
 @dataclass
 class GeoLocation:
     """Structure unifiée pour les données de géolocalisation"""
@@ -72,21 +97,28 @@ class GeoService:
     5. Overpass API (POIs contextuels)
     """
     
-    def __init__(self, db_config: Dict[str, str], cache_ttl: int = 3600):
+    def __init__(self, db_config: Dict[str, str], cache_ttl: int = 3600,
+                 cache_max_size: int = 1000, pool_size: int = 10):
         """
         Initialiser le service de géolocalisation
         
         Args:
             db_config: Configuration MySQL
             cache_ttl: Durée de vie du cache en secondes (défaut: 1h)
+            cache_max_size: Nombre maximum de lieux en cache (LRU au-delà)
+            pool_size: Connexions MySQL gardées ouvertes et réutilisées
         """
         self.db_config = db_config
         self.cache_ttl = cache_ttl
-        self.connection = None
-        self.cursor = None
         
-        # Cache en mémoire simple {cache_key: (data, timestamp)}
-        self._cache = {}
+        # Pool MySQL (créé à la première connexion) ; connexion/curseur propres à chaque thread
+        self.pool_size = pool_size
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+        
+        # Cache en mémoire borné (TTL + LRU, thread-safe)
+        self._cache = CacheManager(default_ttl=cache_ttl, max_size=cache_max_size)
         
         # Configuration des APIs externes
         self.nominatim_config = {
@@ -102,27 +134,80 @@ class GeoService:
             'max_pois': 5
         }
         
-        # Dernière requête externe (pour rate limiting)
+        # Session HTTP unique partagée par tous les threads : connexions keep-alive vers
+        # Nominatim / Overpass réutilisées (pool_maxsize = connexions max par hôte).
+        # Requêtes relancées sur 429/5xx avec backoff, y compris les POST Overpass (lecture seule)
+        self.http = requests.Session()
+        self.http.headers.update(self.nominatim_config['headers'])
+        self.http.mount('https://', HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=2, backoff_factor=1.0, status_forcelist=(429, 502, 503, 504),
+                             allowed_methods=frozenset({'GET', 'POST'}))
+        ))
+        
+        # Réponses Nominatim par coordonnées arrondies (~11 m) : évite l'attente du rate limit
+        self._nominatim_cache = CacheManager(default_ttl=cache_ttl, max_size=cache_max_size)
+        
+        # Dernière requête externe (pour rate limiting), partagée par les threads de génération
         self._last_external_request = 0
+        self._rate_limit_lock = threading.Lock()
         
         logger.info("🌍 GeoService initialisé")
     
+    @property
+    def connection(self):
+        """Connexion MySQL du thread courant"""
+        return getattr(self._local, 'connection', None)
+    
+    @connection.setter
+    def connection(self, value):
+        self._local.connection = value
+    
+    @property
+    def cursor(self):
+        """Curseur MySQL du thread courant"""
+        return getattr(self._local, 'cursor', None)
+    
+    @cursor.setter
+    def cursor(self, value):
+        self._local.cursor = value
+    
+    def _get_pool(self) -> mysql.connector.pooling.MySQLConnectionPool:
+        """Créer le pool au premier besoin (MySQL peut être absent au démarrage)"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = mysql.connector.pooling.MySQLConnectionPool(
+                        pool_name='geo_service',
+                        pool_size=self.pool_size,
+                        **self.db_config
+                    )
+                    logger.info(f"🏊 Pool MySQL créé ({self.pool_size} connexions)")
+        return self._pool
+    
     def connect_db(self):
-        """Établir la connexion MySQL"""
+        """Emprunter une connexion MySQL au pool"""
         try:
-            self.connection = mysql.connector.connect(**self.db_config)
+            self.connection = self._get_pool().get_connection()
             self.cursor = self.connection.cursor(dictionary=True)
             logger.debug("✅ Connexion MySQL établie")
+        except mysql.connector.errors.PoolError as e:
+            # Base joignable mais toutes les connexions sont empruntées : ce n'est pas une panne MySQL
+            logger.warning(f"⚠️ Pool MySQL épuisé ({self.pool_size} connexions): {e}")
+            raise
         except mysql.connector.Error as e:
             logger.error(f"❌ Erreur connexion MySQL: {e}")
             raise
     
     def disconnect_db(self):
-        """Fermer la connexion MySQL"""
+        """Rendre la connexion MySQL au pool (close() d'une connexion poolée)"""
         if self.cursor:
             self.cursor.close()
+            self.cursor = None
         if self.connection:
             self.connection.close()
+            self.connection = None
         logger.debug("🔌 Connexion MySQL fermée")
     
     def _get_cache_key(self, lat: float, lon: float, radius: float) -> str:
@@ -130,17 +215,19 @@ class GeoService:
         key_string = f"{lat:.6f},{lon:.6f},{radius}"
         return hashlib.md5(key_string.encode()).hexdigest()[:16]
     
-    def _is_cache_valid(self, timestamp: float) -> bool:
-        """Vérifier si l'entrée de cache est encore valide"""
-        return time.time() - timestamp < self.cache_ttl
-    
     def _respect_rate_limit(self):
-        """Respecter les limites de taux des APIs externes"""
-        elapsed = time.time() - self._last_external_request
-        if elapsed < self.nominatim_config['rate_limit']:
-            sleep_time = self.nominatim_config['rate_limit'] - elapsed
-            time.sleep(sleep_time)
-        self._last_external_request = time.time()
+        """
+        Respecter les limites de taux des APIs externes
+        
+        Le verrou est gardé pendant l'attente : des générations parallèles
+        passent l'une après l'autre, espacées de rate_limit secondes
+        """
+        with self._rate_limit_lock:
+            elapsed = time.monotonic() - self._last_external_request
+            if elapsed < self.nominatim_config['rate_limit']:
+                sleep_time = self.nominatim_config['rate_limit'] - elapsed
+                time.sleep(sleep_time)
+            self._last_external_request = time.monotonic()
     
     def get_location_info(self, latitude: float, longitude: float, 
                          radius_km: float = 10.0) -> GeoLocation:
@@ -161,11 +248,10 @@ class GeoService:
         
         # Vérifier le cache
         cache_key = self._get_cache_key(latitude, longitude, radius_km)
-        if cache_key in self._cache:
-            cached_data, timestamp = self._cache[cache_key]
-            if self._is_cache_valid(timestamp):
-                logger.info(f"📍 Cache hit pour {latitude:.4f},{longitude:.4f}")
-                return cached_data
+        cached_data = self._cache.get(cache_key)
+        if cached_data is not None:
+            logger.info(f"📍 Cache hit pour {latitude:.4f},{longitude:.4f}")
+            return cached_data
         
         logger.info(f"🌍 Géolocalisation pour {latitude:.4f},{longitude:.4f} (rayon {radius_km}km)")
         
@@ -233,7 +319,7 @@ class GeoService:
             self.disconnect_db()
         
         # Mettre en cache
-        self._cache[cache_key] = (location, time.time())
+        self._cache.set(cache_key, location)
         
         logger.info(f"🎯 Géolocalisation terminée (confiance: {location.confidence_score:.2f})")
         return location
@@ -324,9 +410,9 @@ class GeoService:
             relevance += 0.8  # UNESCO = très pertinent
         elif site_type == 'cultural':
             feature_code = site.get('feature_code', '')
-            if feature_code in ['HSTS', 'MUS', 'MNM']:
+            if feature_code in _MAJOR_CULTURAL_CODES:
                 relevance += 0.6
-            elif feature_code in ['TMPL', 'PAL']:
+            elif feature_code in _NOTABLE_CULTURAL_CODES:
                 relevance += 0.5
             else:
                 relevance += 0.3
@@ -343,17 +429,15 @@ class GeoService:
     
     def _get_city_type(self, feature_code: str) -> str:
         """Convertir le code GeoNames en type lisible"""
-        city_types = {
-            'PPLC': 'capitale',
-            'PPLA': 'centre_administratif', 
-            'PPLA2': 'chef_lieu_region',
-            'PPLA3': 'chef_lieu_district',
-            'PPL': 'ville'
-        }
-        return city_types.get(feature_code, 'localite')
+        return _CITY_TYPES.get(feature_code, 'localite')
     
     def _get_nominatim_data(self, lat: float, lon: float) -> Optional[Dict]:
         """Récupérer les données administratives via Nominatim"""
+        cache_key = f"{lat:.4f},{lon:.4f}"
+        cached_data = self._nominatim_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
+        
         try:
             self._respect_rate_limit()
             
@@ -369,16 +453,19 @@ class GeoService:
                 'accept-language': 'fr,en'
             }
             
-            response = requests.get(
+            response = self.http.get(
                 url,
                 params=params,
-                headers=self.nominatim_config['headers'],
                 timeout=self.nominatim_config['timeout']
             )
             response.raise_for_status()
             
             data = response.json()
-            return data if 'error' not in data else None
+            if 'error' in data:
+                return None
+            
+            self._nominatim_cache.set(cache_key, data)
+            return data
             
         except requests.RequestException as e:
             logger.warning(f"⚠️  Erreur Nominatim: {e}")
@@ -400,7 +487,7 @@ class GeoService:
             out body;
             """
             
-            response = requests.post(
+            response = self.http.post(
                 self.overpass_config['base_url'],
                 data={'data': query},
                 timeout=self.overpass_config['timeout']
@@ -444,11 +531,11 @@ class GeoService:
         
         # Score de pertinence
         relevance = 1.0
-        if tags.get('tourism') in ['attraction', 'museum', 'monument']:
+        if tags.get('tourism') in _ATTRACTION_TOURISM_TAGS:
             relevance += 0.5
         if tags.get('historic'):
             relevance += 0.4
-        if tags.get('natural') in ['peak', 'beach', 'bay']:
+        if tags.get('natural') in _NOTABLE_NATURAL_TAGS:
             relevance += 0.3
         
         # Malus distance
@@ -462,13 +549,11 @@ class GeoService:
             'distance_m': int(distance_m),
             'relevance_score': max(0.1, relevance),
             'source': 'overpass',
-            'tags': {k: v for k, v in tags.items() if k in ['cuisine', 'website', 'opening_hours']}
+            'tags': {k: v for k, v in tags.items() if k in _POI_DETAIL_TAGS}
         }
     
     def _haversine_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculer la distance haversine en km (version Python)"""
-        from math import radians, cos, sin, asin, sqrt
-        
         # Convertir en radians
         lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
         
@@ -653,29 +738,19 @@ class GeoService:
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Retourner les statistiques du cache"""
-        valid_entries = 0
-        total_entries = len(self._cache)
-        
-        current_time = time.time()
-        for _, (_, timestamp) in self._cache.items():
-            if self._is_cache_valid(timestamp):
-                valid_entries += 1
-        
         return {
-            'total_entries': total_entries,
-            'valid_entries': valid_entries,
-            'expired_entries': total_entries - valid_entries,
+            **self._cache.get_stats(),
             'cache_ttl_seconds': self.cache_ttl,
-            'hit_rate': f"{(valid_entries/total_entries*100):.1f}%" if total_entries > 0 else "0%"
+            'nominatim_cache': self._nominatim_cache.get_stats()
         }
     
     def clear_cache(self):
         """Vider le cache"""
         self._cache.clear()
-        logger.info("🗑️  Cache vidé")
+        self._nominatim_cache.clear()
 
 
-# Exemple d'utilisation et tests
+# Exemple d'utilisation et tests (depuis la racine : python -m src.services.geo_service)
 if __name__ == "__main__":
     # Configuration de test
     db_config = {
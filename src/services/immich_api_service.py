@@ -145,7 +145,7 @@ class ImmichAPIService:
             cached_data, timestamp = self._faces_cache[asset_id]
             if time.time() - timestamp < self._cache_ttl:
                 self.stats['cache_hits'] += 1
-                logger.debug(f"📍 Cache hit pour asset {asset_id}")
+                logger.debug("📍 Cache hit pour asset %s", asset_id)
                 return cached_data
         
         logger.info(f"🎭 Récupération visages pour asset {asset_id}")
@@ -212,7 +212,7 @@ class ImmichAPIService:
                         return faces_data['results']
                     
             except Exception as e:
-                logger.debug(f"Endpoint {endpoint} échoué: {e}")
+                logger.debug("Endpoint %s échoué: %s", endpoint, e)
                 continue
         
         logger.warning(f"⚠️  Aucun endpoint de visages fonctionnel pour asset {asset_id}")
@@ -246,7 +246,7 @@ class ImmichAPIService:
             
             # Mettre en cache
             self._people_cache['people'] = (people_dict, time.time())
-            logger.debug(f"📊 {len(people_dict)} personnes en cache")
+            logger.debug("📊 %d personnes en cache", len(people_dict))
             
             return people_dict
             
@@ -95,13 +95,13 @@ class CacheManager:
                     # Hit - déplacer en fin (LRU)
                     self.cache.move_to_end(key)
                     self.stats['hits'] += 1
-                    logger.debug(f"📍 Cache hit: {key}")
+                    logger.debug("📍 Cache hit: %s", key)
                     return entry.access()
                 else:
                     # Expirée
                     del self.cache[key]
                     self.stats['expirations'] += 1
-                    logger.debug(f"⏰ Cache expired: {key}")
+                    logger.debug("⏰ Cache expired: %s", key)
             
             self.stats['misses'] += 1
             return None
@@ -126,19 +126,19 @@ class CacheManager:
                 oldest_key = next(iter(self.cache))
                 del self.cache[oldest_key]
                 self.stats['evictions'] += 1
-                logger.debug(f"🗑️ Cache eviction: {oldest_key}")
+                logger.debug("🗑️ Cache eviction: %s", oldest_key)
             
             # Ajouter la nouvelle entrée
             entry = CacheEntry(value, ttl or self.default_ttl)
             self.cache[key] = entry
-            logger.debug(f"💾 Cache set: {key}")
+            logger.debug("💾 Cache set: %s", key)
     
     def delete(self, key: str) -> bool:
         """Supprimer une entrée du cache"""
         with self.lock:
             if key in self.cache:
                 del self.cache[key]
-                logger.debug(f"🗑️ Cache delete: {key}")
+                logger.debug("🗑️ Cache delete: %s", key)
                 return True
             return False
     
@@ -203,43 +203,21 @@ class CacheManager:
             'stats': stats,
             'entries': entries_info
         }
-    
-    def Xget_info(self) -> Dict[str, Any]:
-        """Récupérer des informations détaillées sur le cache"""
-        return {
-            'stats': self.get_stats(),
-            'entries': []  # Temporairement vide
-            }
-        with self.lock:
-            entries_info = []
-            current_time = time.time()
-            
-            for key, entry in self.cache.items():
-                age = current_time - entry.created_at
-                remaining_ttl = entry.ttl - age
-                
-                entries_info.append({
-                    'key': key,
-                    'age_seconds': int(age),
-                    'remaining_ttl': int(max(0, remaining_ttl)),
-                    'access_count': entry.access_count,
-                    'is_valid': entry.is_valid()
-                })
-            
-            return {
-                'stats': self.get_stats(),
-                'entries': entries_info
-            }
 
 
 class GenerationCache(CacheManager):
     """Cache spécialisé pour les générations de légendes"""
     
-    def get_caption(self, asset_id: str, latitude: float, longitude: float, 
+    def get_caption(self, image_hash: str, latitude: float, longitude: float, 
                    language: str, style: str) -> Optional[Dict[str, Any]]:
-        """Récupérer une légende du cache"""
+        """
+        Récupérer une légende du cache
+        
+        La clé porte sur le contenu de l'image (image_hash) et non sur l'asset_id ;
+        coordonnées arrondies à 6 décimales (~0,1 m)
+        """
         key = self.generate_key(
-            asset_id=asset_id,
+            image=image_hash,
             lat=round(latitude, 6),
             lon=round(longitude, 6),
             lang=language,
@@ -247,11 +225,11 @@ class GenerationCache(CacheManager):
         )
         return self.get(key)
     
-    def set_caption(self, result: Dict[str, Any], asset_id: str, 
+    def set_caption(self, result: Dict[str, Any], image_hash: str, 
                    latitude: float, longitude: float, language: str, style: str):
         """Stocker une légende dans le cache"""
         key = self.generate_key(
-            asset_id=asset_id,
+            image=image_hash,
             lat=round(latitude, 6),
             lon=round(longitude, 6),
             lang=language,
@@ -7,17 +7,54 @@ Centralise le traitement base64, sauvegarde temporaire, etc.
 """
 
 import base64
+import binascii
+import hashlib
+import os
 import tempfile
+import threading
 import logging
 from pathlib import Path
 import time
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 # import imghdr
 from PIL import Image
 import io
 
 logger = logging.getLogger(__name__)
 
+# Chemin des fichiers anonymes (O_TMPFILE) : descripteur du processus courant
+_ANONYMOUS_FILE_PREFIX = '/proc/self/fd/'
+
+
+class TempImage:
+    """
+    Image sauvegardée pour l'analyse : chemin à lire et libération unique
+    
+    Possède le descripteur du fichier anonyme (O_TMPFILE) ou le fichier nommé ;
+    release() le ferme ou le supprime une seule fois, même si elle est rappelée
+    """
+    
+    def __init__(self, path: str, fd: Optional[int] = None):
+        self.path = path
+        self._fd = fd
+        self._released = False
+        self._lock = threading.Lock()
+    
+    def release(self):
+        """Fermer le fichier anonyme ou supprimer le fichier (sans effet si déjà fait)"""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        
+        try:
+            if self._fd is not None:
+                os.close(self._fd)
+            else:
+                Path(self.path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"⚠️  Suppression fichier temporaire impossible: {e}")
+
 
 class ImageProcessor:
     """Gestionnaire centralisé pour le traitement des images"""
@@ -34,31 +71,45 @@ class ImageProcessor:
         self.max_size = max_size
         self.temp_dir.mkdir(exist_ok=True)
         
-    def save_base64_image(self, image_base64: str, asset_id: str) -> Optional[str]:
+    def save_base64_image(self, image_base64: Union[str, bytes], asset_id: str) -> Optional[TempImage]:
         """
         Sauvegarder une image base64 temporairement
         
         Args:
-            image_base64: Image encodée en base64
+            image_base64: Image encodée en base64 (str ou bytes)
             asset_id: ID de l'asset pour nommage unique
             
         Returns:
-            Chemin vers le fichier temporaire ou None si erreur
+            Image temporaire (à libérer avec release()) ou None si erreur
         """
         try:
             # Décoder le base64
             image_data = self._decode_base64(image_base64)
+        except Exception as e:
+            logger.error(f"❌ Erreur sauvegarde image: {e}")
+            return None
+        
+        return self.save_image_bytes(image_data, asset_id)
+    
+    def save_image_bytes(self, image_data: bytes, asset_id: str) -> Optional[TempImage]:
+        """
+        Sauvegarder une image brute (déjà décodée) temporairement
+        
+        Args:
+            image_data: Contenu binaire de l'image
+            asset_id: ID de l'asset pour nommage unique
             
-            # Vérifier la taille
-            if len(image_data) > self.max_size:
-                raise ValueError(f"Image trop grande: {len(image_data)} bytes (max: {self.max_size})")
+        Returns:
+            Image temporaire (à libérer avec release()) ou None si erreur
+        """
+        try:
+            image_format = self._check_image(image_data)
             
-            # Vérifier le format
-
-            image_format = self._verify_image_format(image_data)
-            if not image_format:
-                raise ValueError("Format d'image non supporté")
-   
+            # Fichier anonyme si le système le permet : rien à supprimer, même après un crash
+            temp_image = self._write_anonymous_file(image_data)
+            if temp_image:
+                logger.info(f"📁 Image sauvée: fichier anonyme {asset_id} ({len(image_data):,} bytes)")
+                return temp_image
             
             # Créer un fichier temporaire unique
             timestamp = int(time.time() * 1000)
@@ -70,24 +121,113 @@ class ImageProcessor:
                 f.write(image_data)
             
             logger.info(f"📁 Image sauvée: {temp_file.name} ({len(image_data):,} bytes)")
-            return str(temp_file)
+            return TempImage(str(temp_file))
             
         except Exception as e:
             logger.error(f"❌ Erreur sauvegarde image: {e}")
             return None
     
-    def _decode_base64(self, image_base64: str) -> bytes:
-        """Décoder une image base64"""
-        # Supprimer le préfixe data:image/xxx;base64, si présent
-        if ',' in image_base64:
-            image_base64 = image_base64.split(',')[1]
+    def _write_anonymous_file(self, image_data: bytes) -> Optional[TempImage]:
+        """
+        Écrire l'image dans un fichier sans nom (O_TMPFILE, Linux)
+        
+        Le fichier reste lisible via /proc/self/fd/<fd> et disparaît à la
+        fermeture du descripteur, détenu par l'image temporaire retournée.
+        
+        Returns:
+            Image temporaire, ou None si O_TMPFILE n'est pas disponible
+        """
+        if not hasattr(os, 'O_TMPFILE'):
+            return None
+        
+        try:
+            fd = os.open(self.temp_dir, os.O_TMPFILE | os.O_RDWR, 0o600)
+        except OSError:
+            # Noyau ou système de fichiers sans O_TMPFILE
+            return None
+        
+        try:
+            with open(fd, 'wb', closefd=False) as f:
+                f.write(image_data)
+        except Exception:
+            os.close(fd)
+            raise
+        
+        return TempImage(f"{_ANONYMOUS_FILE_PREFIX}{fd}", fd)
+    
+    def load_image_bytes(self, image_data: bytes) -> Optional[bytes]:
+        """
+        Valider une image reçue en binaire (sans base64 ni fichier temporaire)
+        
+        Returns:
+            Contenu binaire de l'image ou None si invalide
+        """
+        try:
+            self._check_image(image_data)
+            return image_data
+        except Exception as e:
+            logger.error(f"❌ Erreur validation image: {e}")
+            return None
+    
+    def _check_image(self, image_data: bytes) -> str:
+        """
+        Vérifier la taille et le format d'une image décodée
+        
+        Returns:
+            Extension du format détecté
+            
+        Raises:
+            ValueError: image trop grande ou format non supporté
+        """
+        if len(image_data) > self.max_size:
+            raise ValueError(f"Image trop grande: {len(image_data)} bytes (max: {self.max_size})")
+        
+        image_format = self._verify_image_format(image_data)
+        if not image_format:
+            raise ValueError("Format d'image non supporté")
+        
+        return image_format
+    
+    def decode_base64_image(self, image_base64: Union[str, bytes]) -> Optional[bytes]:
+        """
+        Décoder une image base64 sans en vérifier le format (fait par load_image_bytes)
+        
+        Returns:
+            Contenu binaire de l'image ou None si base64 invalide ou image trop grande
+        """
+        try:
+            return self._decode_base64(image_base64)
+        except Exception as e:
+            logger.error(f"❌ Erreur décodage image: {e}")
+            return None
+    
+    def image_digest(self, image_data: bytes) -> str:
+        """
+        Empreinte du contenu décodé d'une image (clé de cache)
+        
+        Même empreinte pour la même image en JSON (base64, avec ou sans préfixe
+        data URL ni retours à la ligne) ou en binaire, quel que soit son asset_id
+        """
+        return hashlib.blake2b(image_data, digest_size=16).hexdigest()
+    
+    def _decode_base64(self, image_base64: Union[str, bytes]) -> bytes:
+        """Décoder une image base64 (str ou bytes, avec ou sans préfixe data URL)"""
+        # Une seule copie en bytes ; le préfixe data:image/xxx;base64, est
+        # sauté par une vue mémoire au lieu d'un découpage de la chaîne
+        encoded = image_base64.encode('ascii') if isinstance(image_base64, str) else image_base64
+        payload = memoryview(encoded)[encoded.find(b',') + 1:]
+        
+        # Refuser une image trop grande d'après la longueur du base64, sans la décoder
+        decoded_size = len(payload) * 3 // 4 - payload[-2:].tobytes().count(b'=')
+        if decoded_size > self.max_size:
+            raise ValueError(f"Image trop grande: {decoded_size} bytes (max: {self.max_size})")
         
         # Ajouter padding si nécessaire
-        missing_padding = len(image_base64) % 4
+        missing_padding = len(payload) % 4
         if missing_padding:
-            image_base64 += '=' * (4 - missing_padding)
+            return binascii.a2b_base64(payload.tobytes() + b'=' * (4 - missing_padding))
         
-        return base64.b64decode(image_base64)
+        return binascii.a2b_base64(payload)
     
     def _verify_image_format(self, image_data: bytes) -> Optional[str]:
         """Vérifier et retourner le format de l'image"""
@@ -194,11 +334,10 @@ class ImageProcessor:
             except:
                 mime_type = "image/jpeg"  # Fallback
             
-            # Encoder en base64
-            base64_data = base64.b64encode(image_data).decode('utf-8')
-            
-            # Retourner avec préfixe data URL
-            return f"data:{mime_type};base64,{base64_data}"
+            # Encoder en base64 et préfixer (data URL) sur des bytes, une seule conversion en str
+            return b''.join((
+                b'data:', mime_type.encode('ascii'), b';base64,', base64.b64encode(image_data)
+            )).decode('ascii')
             
         except Exception as e:
             logger.error(f"Erreur encodage base64: {e}")
@@ -212,7 +351,7 @@ def get_image_processor(temp_dir: Path = None, max_size: int = None) -> ImagePro
     global _image_processor
     
     if _image_processor is None:
-        from config.server_config import ServerConfig
+        from src.config.server_config import ServerConfig
         _image_processor = ImageProcessor(
             temp_dir=temp_dir or ServerConfig.TEMP_DIR,
             max_size=max_size or ServerConfig.MAX_IMAGE_SIZE
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+📍 src/utils/json_utils.py
+
+Sérialisation JSON des réponses Flask
+Utilise orjson (C) si disponible, sinon le module json standard
+"""
+
+from typing import Any, Union
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+# orjson est optionnel : repli sur json standard s'il n'est pas installé
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Fournisseur JSON Flask basé sur orjson"""
+
+    # Mêmes choix que ServerConfig.get_flask_config (JSON_AS_ASCII / JSON_SORT_KEYS)
+    ensure_ascii = False
+    sort_keys = False
+
+    def _options(self, indent: bool, sort_keys: bool) -> int:
+        """Options orjson équivalentes aux arguments de json.dumps"""
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Sérialiser en JSON (orjson si disponible)"""
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+
+        option = self._options(kwargs.get('indent'), kwargs.get('sort_keys', self.sort_keys))
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        """Désérialiser du JSON (orjson si disponible) : request.get_json() en profite"""
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """Réponse jsonify() construite directement depuis les bytes orjson"""
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent, self.sort_keys))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
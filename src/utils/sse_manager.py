@@ -7,54 +7,124 @@ Gère les connexions, messages et broadcasting
 """
 
 import json
-import queue
 import logging
 import time
-from typing import Dict, Any, Optional
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Any, Iterator, Optional
 from datetime import datetime
-from threading import Lock
+from threading import Condition, Lock
+
+from .time_utils import now_epoch_ms
+
+# orjson est optionnel : repli sur json standard s'il n'est pas installé
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Trames SSE fixes, construites une seule fois (bytes : pas de réencodage par Werkzeug)
+_CONNECTED_FRAME = f"data: {json.dumps({'event': 'connected', 'message': 'Connexion SSE établie'})}\n\n".encode('utf-8')
+_HEARTBEAT_TEMPLATE = b'data: {"event": "heartbeat", "timestamp": %d}\n\n'
+_PROGRESS_TEMPLATE = b'event: progress\ndata: {"event":"progress","data":%s,"timestamp":%d}\n\n'
+
+# Événements qui terminent le flux SSE
+_TERMINAL_EVENTS = frozenset(('complete', 'error'))
+
+
+def _dumps(obj: Any) -> bytes:
+    """Sérialiser en JSON UTF-8 (orjson si disponible)"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+@lru_cache(maxsize=256)
+def _progress_data(step: str, progress: int, details: str) -> bytes:
+    """Partie 'data' d'une progression : étapes et textes fixes, sérialisés une fois"""
+    return _dumps({'step': step, 'progress': progress, 'details': details})
+
 
 class SSEConnection:
     """Représente une connexion SSE individuelle"""
     
-    def __init__(self, request_id: str, timeout: float = 1.0):
+    def __init__(self, request_id: str):
         self.request_id = request_id
-        self.message_queue = queue.Queue()
-        self.timeout = timeout
+        # File des messages en attente, réveil du lecteur dès l'ajout
+        self._pending = deque()
+        self._ready = Condition()
         self.created_at = time.time()
         self.last_activity = time.time()
         self.is_active = True
     
+    @property
+    def queue_size(self) -> int:
+        """Nombre de messages en attente"""
+        return len(self._pending)
+    
     def send_message(self, event: str, data: Dict[str, Any]):
         """Ajouter un message à la queue"""
         if self.is_active:
+            now = time.time()
             message = {
                 'event': event,
                 'data': data,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': int(now * 1000)  # epoch ms
             }
-            self.message_queue.put(message)
-            self.last_activity = time.time()
+            with self._ready:
+                # Une progression non lue est remplacée par la suivante
+                if event == 'progress' and self._coalesce_progress(message):
+                    self.last_activity = now
+                    return
+                self._pending.append(message)
+                self.last_activity = now
+                self._ready.notify()
+    
+    def _coalesce_progress(self, message: Dict[str, Any]) -> bool:
+        """
+        Remplacer la dernière progression de la même étape si le client ne l'a pas encore lue
+        
+        Seul le dernier message en attente est remplacé, et seulement pour la même
+        étape : les changements d'étape, résultats, erreurs et fin restent dans l'ordre
+        d'émission.
+        Appelé avec self._ready verrouillé
+        
+        Returns:
+            True si le message a remplacé une progression en attente
+        """
+        if not self._pending:
+            return False
+        last = self._pending[-1]
+        if last['event'] != 'progress' or last['data'].get('step') != message['data'].get('step'):
+            return False
+        self._pending[-1] = message
+        return True
     
     def get_message(self, timeout: Optional[float] = None) -> Optional[Dict]:
-        """Récupérer un message de la queue"""
-        try:
-            return self.message_queue.get(timeout=timeout or self.timeout)
-        except queue.Empty:
+        """
+        Attendre le prochain message de la queue
+        
+        Args:
+            timeout: Attente maximale en secondes (None : jusqu'à un message ou la fermeture)
+            
+        Returns:
+            Le message, ou None si timeout ou connexion fermée
+        """
+        with self._ready:
+            self._ready.wait_for(lambda: self._pending or not self.is_active, timeout)
+            if self._pending:
+                return self._pending.popleft()
             return None
     
     def close(self):
         """Fermer la connexion"""
-        self.is_active = False
-        # Vider la queue
-        while not self.message_queue.empty():
-            try:
-                self.message_queue.get_nowait()
-            except queue.Empty:
-                break
+        with self._ready:
+            self.is_active = False
+            # Vider la queue et réveiller le lecteur en attente
+            self._pending.clear()
+            self._ready.notify_all()
 
 
 class SSEManager:
@@ -70,15 +140,14 @@ class SSEManager:
             'errors': 0
         }
     
-    def create_connection(self, request_id: str, timeout: float = 1.0) -> SSEConnection:
+    def create_connection(self, request_id: str) -> SSEConnection:
         """Créer une nouvelle connexion SSE"""
         with self.lock:
             # Fermer une connexion existante si elle existe
-            if request_id in self.connections:
-                self.close_connection(request_id)
+            self._close_locked(request_id)
             
             # Créer la nouvelle connexion
-            connection = SSEConnection(request_id, timeout)
+            connection = SSEConnection(request_id)
             self.connections[request_id] = connection
             
             self.stats['total_connections'] += 1
@@ -94,11 +163,15 @@ class SSEManager:
     def close_connection(self, request_id: str):
         """Fermer et supprimer une connexion"""
         with self.lock:
-            if request_id in self.connections:
-                self.connections[request_id].close()
-                del self.connections[request_id]
-                self.stats['active_connections'] = len(self.connections)
-                logger.info(f"📡 Connexion SSE fermée: {request_id}")
+            self._close_locked(request_id)
+    
+    def _close_locked(self, request_id: str):
+        """Fermer et supprimer une connexion (self.lock déjà détenu, Lock non réentrant)"""
+        connection = self.connections.pop(request_id, None)
+        if connection:
+            connection.close()
+            self.stats['active_connections'] = len(self.connections)
+            logger.info(f"📡 Connexion SSE fermée: {request_id}")
     
     def broadcast_progress(self, request_id: str, step: str, progress: int, 
                           details: str = ""):
@@ -116,6 +189,27 @@ class SSEManager:
             'result': result
         })
     
+    def broadcast_stage(self, request_id: str, step: str, progress: int,
+                        details: str, result: Dict[str, Any], progress_step: Optional[str] = None):
+        """
+        Envoyer la fin d'une étape en un seul message
+        
+        Événement 'result' (step, result) complété par la progression
+        (progress_step, progress, details) : remplace la paire broadcast_progress +
+        broadcast_result en gardant leurs identifiants d'étape respectifs
+        
+        Args:
+            step: Étape du résultat (ex. 'raw_caption')
+            progress_step: Étape de la progression si elle diffère (ex. 'caption_generation')
+        """
+        self._send_message(request_id, 'result', {
+            'step': step,
+            'result': result,
+            'progress_step': progress_step or step,
+            'progress': progress,
+            'details': details
+        })
+    
     def broadcast_error(self, request_id: str, error: str, code: str = "ERROR"):
         """Envoyer une erreur"""
         self._send_message(request_id, 'error', {
@@ -135,13 +229,50 @@ class SSEManager:
             try:
                 connection.send_message(event, data)
                 self.stats['messages_sent'] += 1
-                logger.debug(f"📨 Message SSE envoyé: {event} → {request_id}")
+                logger.debug("📨 Message SSE envoyé: %s → %s", event, request_id)
             except Exception as e:
                 logger.error(f"❌ Erreur envoi SSE: {e}")
                 self.stats['errors'] += 1
         else:
             logger.warning(f"⚠️ Connexion SSE non trouvée: {request_id}")
     
+    def stream_events(self, request_id: str, heartbeat_interval: float) -> Iterator[bytes]:
+        """
+        Générateur du flux SSE d'une requête
+        
+        Bloque jusqu'au prochain message ; un heartbeat n'est émis qu'après
+        heartbeat_interval secondes sans message. S'arrête sur 'complete' ou 'error'.
+        """
+        connection = self.create_connection(request_id)
+        
+        try:
+            # Message de connexion établie
+            yield _CONNECTED_FRAME
+            
+            # Boucle de lecture des messages
+            while connection.is_active:
+                message = connection.get_message(timeout=heartbeat_interval)
+                
+                if message:
+                    # Formater et envoyer le message SSE
+                    yield self.format_sse_response(message)
+                    
+                    # Si c'est un message de fin, arrêter le flux
+                    if message.get('event') in _TERMINAL_EVENTS:
+                        break
+                else:
+                    # Heartbeat pour maintenir la connexion (epoch ms)
+                    yield _HEARTBEAT_TEMPLATE % now_epoch_ms()
+                    
+        except GeneratorExit:
+            # Client a fermé la connexion
+            logger.info(f"Client déconnecté: {request_id}")
+        finally:
+            # Nettoyer la connexion (sauf si une reconnexion l'a déjà remplacée)
+            with self.lock:
+                if self.connections.get(request_id) is connection:
+                    self._close_locked(request_id)
+    
     def cleanup_inactive_connections(self, max_inactive_seconds: int = 300):
         """Nettoyer les connexions inactives"""
         with self.lock:
@@ -154,7 +285,7 @@ class SSEManager:
                     to_remove.append(request_id)
             
             for request_id in to_remove:
-                self.close_connection(request_id)
+                self._close_locked(request_id)
                 logger.info(f"🗑️ Connexion SSE inactive supprimée: {request_id}")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -165,25 +296,30 @@ class SSEManager:
                 request_id: {
                     'created_at': datetime.fromtimestamp(conn.created_at).isoformat(),
                     'last_activity': datetime.fromtimestamp(conn.last_activity).isoformat(),
-                    'queue_size': conn.message_queue.qsize(),
+                    'queue_size': conn.queue_size,
                     'is_active': conn.is_active
                 }
                 for request_id, conn in self.connections.items()
             }
         }
     
-    def format_sse_response(self, message: Dict[str, Any]) -> str:
-        """Formater un message pour SSE"""
+    def format_sse_response(self, message: Dict[str, Any]) -> bytes:
+        """Formater un message pour SSE (trame encodée en UTF-8)"""
         event_type = message.get('event', 'message')
-        data = json.dumps(message)
         
-        # Format SSE standard
-        lines = []
-        lines.append(f"event: {event_type}")
-        lines.append(f"data: {data}")
-        lines.append("")  # Ligne vide pour séparer les messages
+        # Progressions : seul l'horodatage varie, le reste vient du cache
+        if event_type == 'progress':
+            progress = message['data']
+            return _PROGRESS_TEMPLATE % (
+                _progress_data(progress['step'], progress['progress'], progress['details']),
+                message['timestamp']
+            )
+        
+        data = _dumps(message)
         
-        return "\n".join(lines) + "\n"
+        # Format SSE standard : event, data, ligne vide de séparation
+        # (join : une seule allocation pour la trame)
+        return b''.join((b'event: ', event_type.encode('utf-8'), b'\ndata: ', data, b'\n\n'))
 
 
 # Instance globale
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+📍 src/utils/time_utils.py
+
+Utilitaires d'horodatage partagés par les routes API
+Évite de reformater la même date plusieurs fois par seconde
+"""
+
+import time
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Dernier horodatage formaté (seconde epoch, chaîne)
+_timestamp_cache = (0, '')
+
+
+def now_timestamp() -> str:
+    """Horodatage courant au format '%Y-%m-%d %H:%M:%S' (résolution 1s)"""
+    global _timestamp_cache
+    now = int(time.time())
+    cached = _timestamp_cache
+    if now != cached[0]:
+        # Tuple remplacé d'un bloc : pas d'état incohérent entre threads
+        cached = (now, time.strftime(TIMESTAMP_FORMAT, time.localtime(now)))
+        _timestamp_cache = cached
+    return cached[1]
+
+
+def now_epoch_ms() -> int:
+    """Horodatage courant en millisecondes epoch (champs non affichés)"""
+    return time.time_ns() // 1_000_000
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+📍 src/utils/worker_pool.py
+
+Pools de threads partagés pour les appels IA bloquants (Ollama)
+Libère les threads Flask pendant la génération
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Instance globale
+_ai_executor = None
+_ai_lock = threading.Lock()
+
+def get_ai_executor() -> ThreadPoolExecutor:
+    """Obtenir le pool de threads dédié aux générations IA"""
+    global _ai_executor
+    if _ai_executor is None:
+        with _ai_lock:
+            if _ai_executor is None:
+                from src.config.server_config import ServerConfig
+                _ai_executor = ThreadPoolExecutor(
+                    max_workers=ServerConfig.MAX_CONCURRENT_REQUESTS,
+                    thread_name_prefix='ai'
+                )
+                logger.info(f"🧵 Pool IA créé ({ServerConfig.MAX_CONCURRENT_REQUESTS} workers)")
+    return _ai_executor
+
+
+# Pool des générations asynchrones (SSE) et places disponibles (en cours + en attente)
+_generation_executor = None
+_generation_slots = None
+_generation_lock = threading.Lock()
+
+def get_generation_executor() -> ThreadPoolExecutor:
+    """Obtenir le pool de threads des générations asynchrones"""
+    global _generation_executor, _generation_slots
+    if _generation_executor is None:
+        with _generation_lock:
+            if _generation_executor is None:
+                from src.config.server_config import ServerConfig
+                _generation_slots = threading.BoundedSemaphore(
+                    ServerConfig.MAX_ASYNC_WORKERS + ServerConfig.MAX_ASYNC_QUEUE
+                )
+                _generation_executor = ThreadPoolExecutor(
+                    max_workers=ServerConfig.MAX_ASYNC_WORKERS,
+                    thread_name_prefix='caption-gen'
+                )
+                logger.info(f"🧵 Pool générations async créé ({ServerConfig.MAX_ASYNC_WORKERS} workers)")
+    return _generation_executor
+
+def submit_generation(fn: Callable, *args) -> Optional[Future]:
+    """
+    Soumettre une génération asynchrone
+    
+    Returns:
+        Future de la tâche, ou None si la file d'attente est pleine
+    """
+    executor = get_generation_executor()
+    if not _generation_slots.acquire(blocking=False):
+        return None
+    
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        _generation_slots.release()
+        raise
+    
+    future.add_done_callback(lambda _: _generation_slots.release())
+    return future
@@ -6,11 +6,17 @@ cd "$(dirname "$0")"
 # Activer venv
 source venv/bin/activate
 
-# Tuer ancienne instance
-pkill -f caption_server.py
+# Serveur WSGI de production (installé par pip install -r requirements.txt)
+if ! command -v gunicorn > /dev/null; then
+    echo "❌ gunicorn absent du venv : pip install -r requirements.txt"
+    exit 1
+fi
 
-# Lancer en arrière-plan avec logs
-nohup python src/caption_server.py > logs/caption_server.log 2>&1 &
+# Tuer ancienne instance (serveur de développement ou gunicorn)
+pkill -f caption_server
+
+# Lancer en arrière-plan avec logs (un seul worker : voir gunicorn_conf.py)
+nohup gunicorn -c gunicorn_conf.py 'src.caption_server:create_wsgi_app()' > logs/caption_server.log 2>&1 &
 
 echo "✅ Caption server lancé (PID: $!)"
 echo "📝 Logs: tail -f logs/caption_server.log"
\ No newline at end of file
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+📍 tests/unit/conftest.py
+
+Fixtures communes des tests unitaires de l'API (client de test Flask, services factices)
+"""
+
+import base64
+import io
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Mêmes chemins d'import que `python src/caption_server.py` (racine + src/)
+ROOT_DIR = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / 'src'))
+
+
+class FakeAIService:
+    """Service IA factice : compte les appels, peut être bloqué ou échouer"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.error = None
+
+    def generate_caption(self, image_path=None, image_bytes=None, latitude=None,
+                         longitude=None, language='français', style='creative'):
+        self.calls += 1
+        self.release.wait(timeout=5)
+        if self.error:
+            raise self.error
+
+        return SimpleNamespace(
+            caption='Coucher de soleil sur la Seine',
+            language=language,
+            style=style,
+            confidence_score=0.8,
+            generation_time_seconds=0.1,
+            image_analysis={},
+            geo_context={},
+            ai_models_used=['llava:7b'],
+            processing_steps=['image_analysis'],
+            intermediate_results={'caption_raw': 'Coucher de soleil'},
+            prompts_used={}
+        )
+
+
+class FakeImmichService:
+    """Service Immich factice : contexte visages propre à chaque asset"""
+
+    def get_asset_faces(self, asset_id):
+        return {'asset_id': asset_id}
+
+    def generate_face_context_for_ai(self, faces_info):
+        return {'social_context': f"visages de {faces_info['asset_id']}"}
+
+
+@pytest.fixture
+def ai_service():
+    return FakeAIService()
+
+
+@pytest.fixture
+def app(ai_service):
+    # Imports différés : les modules de test sont ignorés si Flask est absent
+    from src.caption_server import create_app
+    from src.api import routes
+    from src.utils.cache_manager import get_generation_cache
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    app.config['SERVICES'] = {
+        'ai_service': ai_service,
+        'immich_service': FakeImmichService()
+    }
+    app.config['AI_SERVICE'] = ai_service
+
+    # État partagé entre requêtes : repartir de zéro à chaque test
+    get_generation_cache().clear()
+    routes._generation_jobs.clear()
+    yield app
+    get_generation_cache().clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def image_bytes():
+    """Petite image PNG valide"""
+    Image = pytest.importorskip('PIL.Image')
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'orange').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def caption_body(image_bytes):
+    """Corps JSON de generate-caption (image de test, coordonnées de Paris)"""
+    def make(asset_id='asset-1', **extra):
+        return {
+            'asset_id': asset_id,
+            'image_base64': 'data:image/png;base64,' + base64.b64encode(image_bytes).decode('ascii'),
+            'latitude': 48.8566,
+            'longitude': 2.3522,
+            **extra
+        }
+    return make
+
+
+@pytest.fixture
+def wait_until():
+    """Attendre qu'une condition devienne vraie (échec après timeout secondes)"""
+    def wait(condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                raise AssertionError("Condition non atteinte")
+            time.sleep(0.01)
+    return wait
+
+
+@pytest.fixture
+def wait_for_job(client, wait_until):
+    """Interroger GET /ai/jobs/<job_id> jusqu'à la fin de la génération"""
+    def wait(job_id):
+        responses = []
+
+        def finished():
+            responses.append(client.get(f'/api/ai/jobs/{job_id}'))
+            return responses[-1].status_code != 202
+
+        wait_until(finished)
+        return responses[-1]
+    return wait
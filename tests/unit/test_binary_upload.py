@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+📍 tests/unit/test_binary_upload.py
+
+Upload binaire (POST /ai/generate-caption-binary) et limites de taille des images
+"""
+
+import base64
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('PIL')
+
+from src.utils.image_utils import ImageProcessor, get_image_processor
+
+BINARY_URL = '/api/ai/generate-caption-binary'
+
+
+def test_binary_upload_generates_caption(client, ai_service, image_bytes):
+    response = client.post(
+        f'{BINARY_URL}?asset_id=asset-1&latitude=48.8566&longitude=2.3522&style=factual',
+        data=image_bytes,
+        content_type='image/png'
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['asset_id'] == 'asset-1'
+    assert data['style'] == 'factual'
+    assert data['metadata']['coordinates'] == [48.8566, 2.3522]
+    assert ai_service.calls == 1
+
+
+def test_binary_upload_uses_the_cache(client, ai_service, image_bytes):
+    client.post(f'{BINARY_URL}?asset_id=asset-1', data=image_bytes, content_type='image/png')
+    response = client.post(f'{BINARY_URL}?asset_id=asset-2', data=image_bytes, content_type='image/png')
+
+    data = response.get_json()
+    assert data['cached'] is True
+    assert data['asset_id'] == 'asset-2'
+    assert ai_service.calls == 1
+
+
+def test_json_and_binary_uploads_share_the_cache(client, ai_service, image_bytes):
+    encoded = base64.b64encode(image_bytes).decode('ascii')
+    client.post(f'{BINARY_URL}?asset_id=asset-1', data=image_bytes, content_type='image/png')
+
+    # Même image en base64, avec ou sans préfixe data URL et retours à la ligne
+    wrapped = '\n'.join(encoded[i:i + 8] for i in range(0, len(encoded), 8))
+    for image_base64 in (encoded, 'data:image/png;base64,' + wrapped):
+        response = client.post('/api/ai/generate-caption', json={
+            'asset_id': 'asset-2',
+            'image_base64': image_base64
+        })
+        assert response.get_json()['cached'] is True
+
+    assert ai_service.calls == 1
+
+
+@pytest.mark.parametrize('query, body, code', [
+    ('', b'image', 'MISSING_ASSET_ID'),
+    ('?asset_id=asset-1', b'', 'MISSING_IMAGE'),
+    ('?asset_id=asset-1&latitude=200&longitude=0', b'image', 'INVALID_COORDINATES'),
+])
+def test_binary_upload_validation(client, query, body, code):
+    response = client.post(f'{BINARY_URL}{query}', data=body, content_type='application/octet-stream')
+
+    assert response.status_code == 400
+    assert response.get_json()['code'] == code
+
+
+def test_binary_upload_rejects_non_image(client, ai_service):
+    response = client.post(f'{BINARY_URL}?asset_id=asset-1', data=b'pas une image',
+                           content_type='application/octet-stream')
+
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'IMAGE_PROCESSING_ERROR'
+    assert ai_service.calls == 0
+
+
+def test_oversized_body_returns_413(app, client):
+    app.config['MAX_CONTENT_LENGTH'] = 1024
+
+    response = client.post(f'{BINARY_URL}?asset_id=asset-1', data=b'0' * 2048,
+                           content_type='application/octet-stream')
+
+    assert response.status_code == 413
+    assert response.get_json()['code'] == 'PAYLOAD_TOO_LARGE'
+
+
+def test_oversized_base64_is_rejected_before_decoding(tmp_path):
+    processor = ImageProcessor(temp_dir=tmp_path, max_size=16)
+
+    # Caractères hors alphabet base64 : seule la vérification de longueur peut lever "trop grande"
+    with pytest.raises(ValueError, match='trop grande'):
+        processor._decode_base64('data:image/png;base64,' + '!' * 64)
+
+    assert len(processor._decode_base64('data:image/png;base64,' + 'A' * 20)) == 15
+
+
+def test_oversized_base64_image_is_refused_by_route(client, ai_service, monkeypatch, image_bytes):
+    monkeypatch.setattr(get_image_processor(), 'max_size', 16)
+
+    response = client.post('/api/ai/generate-caption', json={
+        'asset_id': 'asset-1',
+        'image_base64': base64.b64encode(image_bytes).decode('ascii')
+    })
+
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'IMAGE_PROCESSING_ERROR'
+    assert ai_service.calls == 0
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+📍 tests/unit/test_caption_request.py
+
+Validation du corps de POST /ai/generate-caption (CaptionRequest)
+"""
+
+import pytest
+
+pytest.importorskip('flask')
+
+from src.api.schemas import CaptionRequest, RequestValidationError
+
+
+def test_valid_request_with_defaults():
+    params = CaptionRequest.from_dict({'asset_id': 'asset-1', 'image_base64': 'abcd'})
+
+    assert params.asset_id == 'asset-1'
+    assert params.latitude is None and params.longitude is None
+    assert params.language == 'français'
+    assert params.style == 'creative'
+    assert params.job is False
+
+
+def test_coordinates_are_converted():
+    params = CaptionRequest.from_dict({
+        'asset_id': 'asset-1', 'image_base64': 'abcd', 'latitude': '48.85', 'longitude': 2.35
+    })
+
+    assert (params.latitude, params.longitude) == (48.85, 2.35)
+
+
+def test_single_coordinate_is_ignored():
+    params = CaptionRequest.from_dict({'asset_id': 'asset-1', 'image_base64': 'abcd', 'latitude': 48.85})
+
+    assert params.latitude is None and params.longitude is None
+
+
+@pytest.mark.parametrize('data, code', [
+    ({'image_base64': 'abcd'}, 'MISSING_ASSET_ID'),
+    ({'asset_id': '', 'image_base64': 'abcd'}, 'MISSING_ASSET_ID'),
+    ({'asset_id': 'asset-1'}, 'MISSING_IMAGE'),
+    ({'asset_id': 'asset-1', 'image_base64': ''}, 'MISSING_IMAGE'),
+    ({'asset_id': 'asset-1', 'image_base64': 'abcd', 'latitude': 'nord', 'longitude': 2.35},
+     'INVALID_COORDINATES'),
+    ({'asset_id': 'asset-1', 'image_base64': 'abcd', 'latitude': 91, 'longitude': 2.35},
+     'INVALID_COORDINATES'),
+    ({'asset_id': 'asset-1', 'image_base64': 'abcd', 'latitude': 48.85, 'longitude': -181},
+     'INVALID_COORDINATES'),
+])
+def test_invalid_request_error_codes(data, code):
+    with pytest.raises(RequestValidationError) as error:
+        CaptionRequest.from_dict(data)
+
+    assert error.value.code == code
+
+
+def test_image_not_required_for_binary_upload():
+    params = CaptionRequest.from_dict({'asset_id': 'asset-1'}, require_image=False)
+
+    assert params.image_base64 == ''
+
+
+@pytest.mark.parametrize('value, expected', [
+    (True, True), (False, False), ('1', True), ('true', True), ('TRUE', True),
+    ('0', False), ('false', False), (None, False),
+])
+def test_job_flag(value, expected):
+    params = CaptionRequest.from_dict({'asset_id': 'asset-1', 'image_base64': 'abcd', 'job': value})
+
+    assert params.job is expected
+
+
+def test_route_rejects_invalid_body(client):
+    response = client.post('/api/ai/generate-caption', json={'image_base64': 'abcd'})
+
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'MISSING_ASSET_ID'
+
+
+def test_route_requires_json_body(client):
+    response = client.post('/api/ai/generate-caption', json={})
+
+    assert response.status_code == 400
+    assert response.get_json()['code'] == 'INVALID_JSON'
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+📍 tests/unit/test_generation_jobs.py
+
+Mode tâche de POST /ai/generate-caption ("job": true) et GET /ai/jobs/<job_id>
+"""
+
+import pytest
+
+pytest.importorskip('flask')
+
+from src.api import routes
+
+
+def test_job_mode_returns_202_then_result(client, caption_body, wait_for_job):
+    response = client.post('/api/ai/generate-caption', json=caption_body(job=True))
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['status'] == 'pending'
+    assert body['status_url'] == f"/api/ai/jobs/{body['job_id']}"
+
+    result = wait_for_job(body['job_id'])
+    assert result.status_code == 200
+    data = result.get_json()
+    assert data['success'] is True
+    assert data['asset_id'] == 'asset-1'
+    assert data['caption'] == 'Coucher de soleil sur la Seine'
+
+
+def test_job_result_can_be_reduced(client, caption_body, wait_for_job):
+    response = client.post('/api/ai/generate-caption', json=caption_body(job='true'))
+    job_id = response.get_json()['job_id']
+
+    wait_for_job(job_id)
+    data = client.get(f'/api/ai/jobs/{job_id}?verbose=0').get_json()
+
+    assert set(data) <= set(routes._LITE_RESPONSE_FIELDS)
+    assert 'intermediate_results' not in data
+
+
+def test_job_failure_is_reported(client, ai_service, caption_body, wait_for_job):
+    ai_service.error = RuntimeError('Ollama indisponible')
+
+    response = client.post('/api/ai/generate-caption', json=caption_body(job=True))
+    result = wait_for_job(response.get_json()['job_id'])
+
+    assert result.status_code == 500
+    assert result.get_json()['code'] == 'INTERNAL_ERROR'
+
+
+def test_unknown_job_returns_404(client):
+    response = client.get('/api/ai/jobs/inconnu')
+
+    assert response.status_code == 404
+    assert response.get_json()['code'] == 'JOB_NOT_FOUND'
+
+
+def test_full_queue_returns_503(client, monkeypatch, caption_body):
+    monkeypatch.setattr(routes, 'submit_generation', lambda fn, *args: None)
+
+    response = client.post('/api/ai/generate-caption', json=caption_body(job=True))
+
+    assert response.status_code == 503
+    assert response.get_json()['code'] == 'QUEUE_FULL'
+    assert not routes._inflight_generations
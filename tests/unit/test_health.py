@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+📍 tests/unit/test_health.py
+
+État des sondes base de données / Ollama servi par GET /health
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip('flask')
+
+from src.api import routes
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Sondes factices comptées, sans thread de rafraîchissement"""
+    calls = []
+
+    def probe_backends(services):
+        calls.append(time.monotonic())
+        return {'database': True, 'ollama': len(calls) > 1}
+
+    monkeypatch.setattr(routes, 'probe_backends', probe_backends)
+    monkeypatch.setitem(routes._health_probe, 'snapshot', None)
+    return calls
+
+
+def test_recent_snapshot_is_reused(client, probes):
+    first = client.get('/api/health').get_json()
+    second = client.get('/api/health').get_json()
+
+    assert len(probes) == 1
+    assert first['database'] is True
+    assert second['ollama'] is False
+
+
+def test_stale_snapshot_is_probed_again(client, probes):
+    client.get('/api/health')
+    checked_at, status = routes._health_probe['snapshot']
+    routes._health_probe['snapshot'] = (checked_at - routes.ServerConfig.HEALTH_CHECK_TTL - 1, status)
+
+    data = client.get('/api/health').get_json()
+
+    assert len(probes) == 2
+    assert data['ollama'] is True
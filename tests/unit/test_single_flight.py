@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+📍 tests/unit/test_single_flight.py
+
+Générations partagées entre requêtes identiques simultanées et places de génération synchrone
+"""
+
+import threading
+
+import pytest
+
+pytest.importorskip('flask')
+
+from src.api import routes
+
+
+def test_identical_requests_share_one_generation(app, ai_service, monkeypatch, caption_body,
+                                                 wait_until):
+    # Compter les requêtes arrivées au single-flight avant de libérer la génération
+    arrivals = []
+    shared_generation = routes.shared_generation
+
+    def counting_shared_generation(key, submit):
+        arrivals.append(key)
+        return shared_generation(key, submit)
+
+    monkeypatch.setattr(routes, 'shared_generation', counting_shared_generation)
+    ai_service.release.clear()
+
+    responses = {}
+
+    def post(asset_id):
+        response = app.test_client().post(
+            '/api/ai/generate-caption', json=caption_body(asset_id)
+        )
+        responses[asset_id] = response
+
+    threads = [threading.Thread(target=post, args=(asset_id,)) for asset_id in ('asset-1', 'asset-2')]
+    for thread in threads:
+        thread.start()
+    wait_until(lambda: len(arrivals) == 2)
+    ai_service.release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert ai_service.calls == 1
+    assert not routes._inflight_generations
+
+    # Résultat partagé, mais champs propres à chaque asset
+    for asset_id in ('asset-1', 'asset-2'):
+        data = responses[asset_id].get_json()
+        assert responses[asset_id].status_code == 200
+        assert data['asset_id'] == asset_id
+        assert data['intermediate_results']['face_context']['social_context'] == f'visages de {asset_id}'
+
+
+def test_cache_hit_keeps_requesting_asset(client, ai_service, caption_body):
+    client.post('/api/ai/generate-caption', json=caption_body('asset-1'))
+    response = client.post('/api/ai/generate-caption', json=caption_body('asset-2'))
+
+    data = response.get_json()
+    assert ai_service.calls == 1
+    assert data['cached'] is True
+    assert data['asset_id'] == 'asset-2'
+    assert data['metadata']['coordinates'] == [48.8566, 2.3522]
+    assert data['intermediate_results']['face_context']['social_context'] == 'visages de asset-2'
+
+
+def test_shared_result_keeps_request_coordinates(client, ai_service, caption_body):
+    client.post('/api/ai/generate-caption', json=caption_body('asset-1'))
+    response = client.post('/api/ai/generate-caption', json=caption_body('asset-2', latitude=48.85660001))
+
+    data = response.get_json()
+    assert data['cached'] is True
+    assert data['metadata']['coordinates'] == [48.85660001, 2.3522]
+
+
+def test_failed_generation_is_forgotten(client, ai_service, caption_body, wait_until):
+    ai_service.error = RuntimeError('Ollama indisponible')
+
+    response = client.post('/api/ai/generate-caption', json=caption_body('asset-1'))
+
+    assert response.status_code == 500
+    assert response.get_json()['code'] == 'INTERNAL_ERROR'
+    wait_until(lambda: not routes._inflight_generations)
+
+    # Pas de résultat en cache : la requête suivante relance une génération
+    ai_service.error = None
+    response = client.post('/api/ai/generate-caption', json=caption_body('asset-1'))
+    assert response.status_code == 200
+    assert ai_service.calls == 2
+
+
+def test_no_free_slot_returns_429(client, monkeypatch, caption_body):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(routes, '_request_slots', slots)
+
+    response = client.post('/api/ai/generate-caption', json=caption_body('asset-1'))
+
+    assert response.status_code == 429
+    assert response.get_json()['code'] == 'TOO_MANY_REQUESTS'
+    assert routes.get_active_requests() == 0
+
+
+def test_timeout_keeps_slot_until_generation_ends(client, ai_service, monkeypatch, caption_body,
+                                                  wait_until):
+    monkeypatch.setattr(routes.ServerConfig, 'REQUEST_TIMEOUT', 0.05)
+    ai_service.release.clear()
+
+    response = client.post('/api/ai/generate-caption', json=caption_body('asset-1'))
+
+    assert response.status_code == 504
+    assert routes.get_active_requests() == 1
+    ai_service.release.set()
+    wait_until(lambda: routes.get_active_requests() == 0)
+
+
+def test_job_keeps_slot_until_generation_ends(client, ai_service, caption_body, wait_until):
+    ai_service.release.clear()
+
+    response = client.post('/api/ai/generate-caption', json=caption_body('asset-1', job=True))
+
+    assert response.status_code == 202
+    assert routes.get_active_requests() == 1
+    ai_service.release.set()
+    wait_until(lambda: routes.get_active_requests() == 0)
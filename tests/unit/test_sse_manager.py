@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+📍 tests/unit/test_sse_manager.py
+
+Connexions SSE : file des messages, trames envoyées et fermeture
+"""
+
+import json
+import threading
+import time
+
+from src.utils.sse_manager import SSEManager
+
+
+def test_stage_event_keeps_result_and_progress_steps():
+    manager = SSEManager()
+    connection = manager.create_connection('req-1')
+
+    manager.broadcast_stage('req-1', 'raw_caption', 85, 'Légende générée', {'caption': 'Légende'},
+                            progress_step='caption_generation')
+    manager.broadcast_stage('req-1', 'geolocation', 50, 'Géolocalisation terminée', {'confidence': 0.9})
+
+    caption = connection.get_message(timeout=0)
+    assert caption['event'] == 'result'
+    assert caption['data'] == {
+        'step': 'raw_caption',
+        'result': {'caption': 'Légende'},
+        'progress_step': 'caption_generation',
+        'progress': 85,
+        'details': 'Légende générée'
+    }
+    assert connection.get_message(timeout=0)['data']['progress_step'] == 'geolocation'
+
+
+def pending_events(connection):
+    """Vider la file : (événement, étape) dans l'ordre d'émission"""
+    events = []
+    while (message := connection.get_message(timeout=0)) is not None:
+        events.append((message['event'], message['data'].get('step')))
+    return events
+
+
+def test_unread_progress_of_same_step_is_replaced():
+    manager = SSEManager()
+    connection = manager.create_connection('req-1')
+
+    manager.broadcast_progress('req-1', 'geolocation', 35, 'Géolocalisation en cours...')
+    manager.broadcast_progress('req-1', 'geolocation', 40, 'Nominatim...')
+
+    message = connection.get_message(timeout=0)
+    assert message['data']['progress'] == 40
+    assert connection.get_message(timeout=0) is None
+
+
+def test_stage_transition_is_not_coalesced():
+    manager = SSEManager()
+    connection = manager.create_connection('req-1')
+
+    manager.broadcast_progress('req-1', 'preparation', 10, 'Image préparée')
+    manager.broadcast_progress('req-1', 'image_analysis', 15, 'Analyse avec LLaVA...')
+    manager.broadcast_progress('req-1', 'image_analysis', 20, 'Analyse...')
+
+    assert pending_events(connection) == [('progress', 'preparation'), ('progress', 'image_analysis')]
+
+
+def test_progress_is_not_merged_across_a_result():
+    manager = SSEManager()
+    connection = manager.create_connection('req-1')
+
+    manager.broadcast_progress('req-1', 'image_analysis', 15, 'Analyse avec LLaVA...')
+    manager.broadcast_result('req-1', 'image_analysis', {'description': 'Plage'})
+    manager.broadcast_progress('req-1', 'image_analysis', 30, 'Analyse terminée')
+
+    assert pending_events(connection) == [
+        ('progress', 'image_analysis'), ('result', 'image_analysis'), ('progress', 'image_analysis')
+    ]
+
+
+def frame_event(frame: bytes) -> str:
+    return json.loads(frame.split(b'data: ', 1)[1])['event']
+
+
+def test_reader_is_woken_by_message_from_another_thread():
+    manager = SSEManager()
+    connection = manager.create_connection('req-1')
+    timer = threading.Timer(0.05, manager.broadcast_complete, args=('req-1', {'caption': 'Légende'}))
+    timer.start()
+
+    started = time.monotonic()
+    message = connection.get_message(timeout=5)
+
+    assert message['event'] == 'complete'
+    assert time.monotonic() - started < 1
+    timer.join()
+
+
+def test_get_message_times_out_without_message():
+    connection = SSEManager().create_connection('req-1')
+
+    assert connection.get_message(timeout=0.01) is None
+
+
+def test_stream_stops_after_terminal_event_and_forgets_connection():
+    manager = SSEManager()
+    stream = manager.stream_events('req-1', heartbeat_interval=5)
+
+    assert frame_event(next(stream)) == 'connected'
+    manager.broadcast_progress('req-1', 'completion', 100, 'Génération terminée!')
+    manager.broadcast_error('req-1', 'Ollama indisponible', 'TIMEOUT')
+    manager.broadcast_progress('req-1', 'completion', 100, 'Après la fin')
+
+    frames = list(stream)
+
+    assert [frame_event(frame) for frame in frames] == ['progress', 'error']
+    assert manager.get_connection('req-1') is None
+    assert manager.get_stats()['active_connections'] == 0
+
+
+def test_heartbeat_is_sent_when_idle():
+    manager = SSEManager()
+    stream = manager.stream_events('req-1', heartbeat_interval=0.01)
+    next(stream)
+
+    assert frame_event(next(stream)) == 'heartbeat'
+    stream.close()
+    assert manager.get_connection('req-1') is None
+
+
+def run_with_timeout(target, timeout=2):
+    """Exécuter target dans un thread : échec s'il ne rend pas la main (interblocage)"""
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "Interblocage"
+
+
+def test_close_wakes_blocked_reader():
+    manager = SSEManager()
+    connection = manager.create_connection('req-1')
+    messages = []
+
+    reader = threading.Thread(target=lambda: messages.append(connection.get_message()))
+    reader.start()
+    time.sleep(0.05)
+    run_with_timeout(lambda: manager.close_connection('req-1'))
+    reader.join(timeout=2)
+
+    assert not reader.is_alive()
+    assert messages == [None]
+    assert manager.get_connection('req-1') is None
+
+
+def test_reconnect_replaces_previous_connection():
+    manager = SSEManager()
+    old_stream = manager.stream_events('req-1', heartbeat_interval=5)
+    next(old_stream)
+    old_connection = manager.get_connection('req-1')
+
+    # Reconnexion : create_connection ferme l'ancienne sous self.lock (sans interblocage)
+    new_stream = manager.stream_events('req-1', heartbeat_interval=5)
+    run_with_timeout(lambda: next(new_stream))
+    new_connection = manager.get_connection('req-1')
+
+    assert new_connection is not old_connection
+    assert not old_connection.is_active
+
+    # L'ancien flux se termine sans retirer la nouvelle connexion
+    assert list(old_stream) == []
+    assert manager.get_connection('req-1') is new_connection
+
+    manager.broadcast_complete('req-1', {'caption': 'Légende'})
+    assert [frame_event(frame) for frame in new_stream] == ['complete']
+
+
+def test_inactive_connections_are_cleaned_up():
+    manager = SSEManager()
+    connection = manager.create_connection('req-1')
+    connection.last_activity -= 600
+
+    run_with_timeout(lambda: manager.cleanup_inactive_connections(max_inactive_seconds=300))
+
+    assert manager.get_connection('req-1') is None
+    assert not connection.is_active
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+📍 tests/unit/test_temp_image.py
+
+Images temporaires des générations asynchrones (fichier anonyme ou nommé, libération unique)
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip('PIL')
+
+from src.utils.image_utils import ImageProcessor
+
+
+def test_saved_image_is_readable_then_released(tmp_path, image_bytes):
+    temp_image = ImageProcessor(temp_dir=tmp_path).save_image_bytes(image_bytes, 'asset-1')
+
+    with open(temp_image.path, 'rb') as f:
+        assert f.read() == image_bytes
+
+    temp_image.release()
+    assert not list(tmp_path.iterdir())
+
+
+def test_second_release_does_not_close_a_reused_descriptor(tmp_path, image_bytes):
+    temp_image = ImageProcessor(temp_dir=tmp_path).save_image_bytes(image_bytes, 'asset-1')
+    temp_image.release()
+
+    # Le numéro du descripteur libéré peut être réattribué à une autre ressource
+    other_fd = os.open(os.devnull, os.O_RDONLY)
+    try:
+        temp_image.release()
+        os.fstat(other_fd)
+    finally:
+        os.close(other_fd)
+
+
+def test_invalid_image_is_not_saved(tmp_path):
+    assert ImageProcessor(temp_dir=tmp_path).save_image_bytes(b'pas une image', 'asset-1') is None
+    assert not list(tmp_path.iterdir())